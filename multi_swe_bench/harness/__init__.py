@@ -1 +1,2 @@
-from multi_swe_bench.harness.repos import *
+# Repo modules are imported lazily by Instance.create; import
+# multi_swe_bench.harness.repos explicitly to register everything eagerly.
@@ -19,7 +19,7 @@ from multi_swe_bench.harness.image import Config, Image
 from multi_swe_bench.harness.instance import Instance
 from multi_swe_bench.harness.pull_request import Base, PullRequest
 from multi_swe_bench.harness.registry import register_data, data_registry
-from multi_swe_bench.utils.docker_util import build, exists, run
+from multi_swe_bench.utils.docker_util import build, exists, run, tag
 from multi_swe_bench.utils.fs_utils import copy_source_code
 from multi_swe_bench.utils.git_util import clone_repository, get_all_commit_hashes
 from multi_swe_bench.utils.logger import get_non_propagate_logger, setup_logger
@@ -162,6 +162,8 @@ def build_image(
     image: Image,
     cli: CliArgs,
     logger: logging.Logger,
+    cache_from: Optional[str] = None,
+    cache_tag: Optional[str] = None,
 ):
     if exists(image.image_full_name()):
         logger.info(f"Image {image.image_full_name()} already exists, skipping...")
@@ -183,6 +185,13 @@ def build_image(
     with open(dockerfile_path, "w", encoding="utf-8", newline="\n") as f:
         f.write(image.dockerfile())
 
+    dockerignore = image.dockerignore()
+    if dockerignore:
+        with open(
+            image_dir / ".dockerignore", "w", encoding="utf-8", newline="\n"
+        ) as f:
+            f.write(dockerignore)
+
     for file in image.files():
         file_path = image_dir / file.dir / file.name
         file_path.parent.mkdir(parents=True, exist_ok=True)
@@ -200,7 +209,11 @@ def build_image(
             cli.log_level,
             cli.print_to_console_build_image,
         ),
+        cache_from=cache_from if cache_from and exists(cache_from) else None,
     )
+    if cache_tag:
+        # Tag the fresh image as the cache source for the next build.
+        tag(image.image_full_name(), cache_tag)
     logger.info(f"Image {image.image_full_name()} built successfully.")
 
 
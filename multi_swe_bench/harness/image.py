@@ -87,5 +87,8 @@ class Image:
     def dockerfile_name(self) -> str:
         return "Dockerfile"
 
+    def dockerignore(self) -> str:
+        return ""
+
     def dockerfile(self) -> str:
         raise NotImplementedError
@@ -1,3 +1,4 @@
+import importlib
 from dataclasses import dataclass
 from typing import Tuple
 
@@ -8,6 +9,87 @@ from multi_swe_bench.harness.pull_request import PullRequest
 from multi_swe_bench.harness.test_result import TestResult
 
 
+# Instances are imported on first use so a run touching one repo does not
+# pay the import cost (regex compilation, module setup) of all the others.
+# @Instance.register still fills _registry when a module is imported; this
+# map only tells create() where to find a class it has not seen yet.
+_lazy_registry = {
+    "OpenMathLib/OpenBLAS": "multi_swe_bench.harness.repos.c.OpenMathLib.OpenBLAS:OpenBLAS",
+    "facebook/zstd": "multi_swe_bench.harness.repos.c.facebook.zstd:Zstd",
+    "fluent/fluent-bit": "multi_swe_bench.harness.repos.c.fluent.fluentbit:FluentBit",
+    "jqlang/jq": "multi_swe_bench.harness.repos.c.jqlang.jq:Jq",
+    "libgit2/libgit2": "multi_swe_bench.harness.repos.c.libgit2.libgit2:Libgit2",
+    "libsdl-org/SDL": "multi_swe_bench.harness.repos.c.libsdlorg.SDL:SDL",
+    "mruby/mruby": "multi_swe_bench.harness.repos.c.mruby.mruby:Mruby",
+    "php/php-src": "multi_swe_bench.harness.repos.c.php.phpsrc:Php",
+    "ponylang/ponyc": "multi_swe_bench.harness.repos.c.ponylang.ponyc:Ponyc",
+    "redis/redis": "multi_swe_bench.harness.repos.c.redis.redis:Redis",
+    "valkey-io/valkey": "multi_swe_bench.harness.repos.c.valkey_io.valkey:Valkey",
+    "bitcoin/bitcoin": "multi_swe_bench.harness.repos.cpp.bitcoin.bitcoin:Bitcoin",
+    "catchorg/Catch2": "multi_swe_bench.harness.repos.cpp.catchorg.catch2:Catch2",
+    "CGAL/cgal": "multi_swe_bench.harness.repos.cpp.cgal.cgal:Cgal",
+    "fmtlib/fmt": "multi_swe_bench.harness.repos.cpp.fmtlib.fmt:Fmt",
+    "halide/Halide": "multi_swe_bench.harness.repos.cpp.halide.Halide:Halide",
+    "nlohmann/json": "multi_swe_bench.harness.repos.cpp.nlohmann.json:Json",
+    "root-project/root": "multi_swe_bench.harness.repos.cpp.rootproject.root:Root",
+    "simdjson/simdjson": "multi_swe_bench.harness.repos.cpp.simdjson.simdjson:Simdjson",
+    "yhirose/cpp-httplib": "multi_swe_bench.harness.repos.cpp.yhirose.cpp_httplib:CppHttplib",
+    "cli/cli": "multi_swe_bench.harness.repos.golang.cli.cli:Cli",
+    "etcd-io/etcd": "multi_swe_bench.harness.repos.golang.etcd_io.etcd:Etcd",
+    "gin-gonic/gin": "multi_swe_bench.harness.repos.golang.gin_gonic.gin:Gin",
+    "go-gorm/gorm": "multi_swe_bench.harness.repos.golang.go_gorm.gorm:Gorm",
+    "grpc/grpc-go": "multi_swe_bench.harness.repos.golang.grpc.grpc_go:GrpcGo",
+    "zeromicro/go-zero": "multi_swe_bench.harness.repos.golang.zeromicro.go_zero:GoZero",
+    "ReactiveX/RxJava": "multi_swe_bench.harness.repos.java.ReactiveX.RxJava:RxJava",
+    "alibaba/fastjson2": "multi_swe_bench.harness.repos.java.alibaba.fastjson2:Fastjson2",
+    "checkstyle/checkstyle": "multi_swe_bench.harness.repos.java.checkstyle.checkstyle:Checkstyle",
+    "eclipse-vertx/vert.x": "multi_swe_bench.harness.repos.java.eclipsevertx.vertx:Vertx",
+    "elastic/logstash": "multi_swe_bench.harness.repos.java.elastic.logstash:Logstash",
+    "junit-team/junit5": "multi_swe_bench.harness.repos.java.junitteam.junit5:Junit5",
+    "keycloak/keycloak": "multi_swe_bench.harness.repos.java.keycloak.keycloak:Keycloak",
+    "mockito/mockito": "multi_swe_bench.harness.repos.java.mockito.mockito:Mockito",
+    "pmd/pmd": "multi_swe_bench.harness.repos.java.pmd.pmd:Pmd",
+    "spotbugs/spotbugs": "multi_swe_bench.harness.repos.java.spotbugs.spotbugs:Spotbugs",
+    "Automattic/mongoose": "multi_swe_bench.harness.repos.javascript.Automattic.mongoose:Mongoose",
+    "Kong/insomnia": "multi_swe_bench.harness.repos.javascript.Kong.insomnia:Insomnia",
+    "anuraghazra/github-readme-stats": "multi_swe_bench.harness.repos.javascript.anuraghazra.github_readme_stats:GithubReadmeStats",
+    "axios/axios": "multi_swe_bench.harness.repos.javascript.axios.axios:Axios",
+    "caolan/async": "multi_swe_bench.harness.repos.javascript.caolan.async_:Async",
+    "expressjs/express": "multi_swe_bench.harness.repos.javascript.expressjs.express:Express",
+    "fastify/fastify": "multi_swe_bench.harness.repos.javascript.fastify.fastify:Fastify",
+    "google/zx": "multi_swe_bench.harness.repos.javascript.google.zx:Zx",
+    "iamkun/dayjs": "multi_swe_bench.harness.repos.javascript.iamkun.dayjs:Dayjs",
+    "sveltejs/svelte": "multi_swe_bench.harness.repos.javascript.sveltejs.svelte:Svelte",
+    "tj/commander.js": "multi_swe_bench.harness.repos.javascript.tj.commanderjs:Commanderjs",
+    "vuejs/vuex": "multi_swe_bench.harness.repos.javascript.vuejs.vuex:Vuex",
+    "BurntSushi/ripgrep": "multi_swe_bench.harness.repos.rust.BurntSushi.ripgrep:Ripgrep",
+    "clap-rs/clap": "multi_swe_bench.harness.repos.rust.clap_rs.clap:Clap",
+    "nushell/nushell": "multi_swe_bench.harness.repos.rust.nushell.nushell:Nushell",
+    "rayon-rs/rayon": "multi_swe_bench.harness.repos.rust.rayon_rs.rayon:Rayon",
+    "serde-rs/serde": "multi_swe_bench.harness.repos.rust.serde_rs.serde:Serde",
+    "sharkdp/bat": "multi_swe_bench.harness.repos.rust.sharkdp.bat:Bat",
+    "sharkdp/fd": "multi_swe_bench.harness.repos.rust.sharkdp.fd:Fd",
+    "tokio-rs/bytes": "multi_swe_bench.harness.repos.rust.tokio_rs.bytes:Bytes",
+    "tokio-rs/tokio": "multi_swe_bench.harness.repos.rust.tokio_rs.tokio:Tokio",
+    "tokio-rs/tracing": "multi_swe_bench.harness.repos.rust.tokio_rs.tracing:Tracing",
+    "NervJS/taro": "multi_swe_bench.harness.repos.typescript.NervJS.taro:Taro",
+    "ant-design/ant-design": "multi_swe_bench.harness.repos.typescript.ant_design.ant_design:AntDesign",
+    "chakra-ui/chakra-ui": "multi_swe_bench.harness.repos.typescript.chakra_ui.chakra_ui:ChakraUi",
+    "colinhacks/zod": "multi_swe_bench.harness.repos.typescript.colinhacks.zod:Zod",
+    "darkreader/darkreader": "multi_swe_bench.harness.repos.typescript.darkreader.darkreader:Darkreader",
+    "facebook/docusaurus": "multi_swe_bench.harness.repos.typescript.facebook.docusaurus:Puppeteer",
+    "mui/material-ui": "multi_swe_bench.harness.repos.typescript.mui.material_ui:MaterialUi",
+    "nuxt/nuxt": "multi_swe_bench.harness.repos.typescript.nuxt.nuxt:Nuxt",
+    "puppeteer/puppeteer": "multi_swe_bench.harness.repos.typescript.puppeteer.puppeteer:Puppeteer",
+    "reduxjs/redux": "multi_swe_bench.harness.repos.typescript.reduxjs.redux:Redux",
+    "remix-run/react-router": "multi_swe_bench.harness.repos.typescript.remix_run.react_router:ReactRouter",
+    "trpc/trpc": "multi_swe_bench.harness.repos.typescript.trpc.trpc:Trpc",
+    "vuejs/core": "multi_swe_bench.harness.repos.typescript.vuejs.core:Core",
+    "vuejs/vue": "multi_swe_bench.harness.repos.typescript.vuejs.vue:Vue",
+    "withastro/astro": "multi_swe_bench.harness.repos.typescript.withastro.astro:Astro",
+}
+
+
 class Instance:
     _registry = {}
 
@@ -31,6 +113,11 @@ class Instance:
     @classmethod
     def create(cls, pr: PullRequest, config: Config, *args, **kwargs):
         name = f"{pr.org}/{pr.repo}"
+        if name not in cls._registry and name in _lazy_registry:
+            module_name, _, class_name = _lazy_registry[name].partition(":")
+            module = importlib.import_module(module_name)
+            cls._registry.setdefault(name, getattr(module, class_name))
+
         if name in cls._registry:
             return cls._registry[name](pr, config, *args, **kwargs)
         raise ValueError(f"Instance '{name}' is not registered.")
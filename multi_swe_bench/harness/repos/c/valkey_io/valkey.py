@@ -1,9 +1,107 @@
-import re
+try:
+    import re2 as re  # DFA-based engine; linear time on large CI logs
+except ImportError:
+    import re
+import string
+import sys
 from typing import Optional, Union
 
 from multi_swe_bench.harness.image import Config, File, Image
 from multi_swe_bench.harness.instance import Instance, TestResult
 from multi_swe_bench.harness.pull_request import PullRequest
+from multi_swe_bench.utils.log_util import FAIL, PASS, SKIP, merge_last_wins, scan_log
+
+# One multiline pattern over the whole log; `[^\S\n]` pads where the old
+# per-line loop relied on `line.strip()`. The literal `[` prefix is
+# factored out so lines that cannot match are rejected on one character.
+_VALKEY_PATTERN = (
+    r"^[^\S\n]*\["
+    r"(?:ok\]: (?P<passed>.+?)"
+    r"|(?:err|exception)\]: (?P<failed>.+?))"
+    r"(?: \(.+\))?[^\S\n]*$"
+)
+_VALKEY_RE = re.compile(_VALKEY_PATTERN, re.MULTILINE)
+# Bytes variant so callers holding raw container output can skip the
+# full decode pass; only matched test names are decoded.
+_VALKEY_RE_B = re.compile(_VALKEY_PATTERN.encode(), re.MULTILINE)
+
+
+def _scan_chunk(test_log: Union[str, bytes]) -> dict[str, int]:
+    is_bytes = isinstance(test_log, (bytes, bytearray))
+    pattern = _VALKEY_RE_B if is_bytes else _VALKEY_RE
+
+    status: dict[str, int] = {}
+    for match in pattern.finditer(test_log):
+        kind = match.lastgroup
+        name = match.group(kind)
+        if is_bytes:
+            name = name.decode("utf-8", errors="replace")
+        # Repeated names collapse to one string object across the sets.
+        name = sys.intern(name)
+        status[name] = PASS if kind == "passed" else FAIL
+    return status
+
+
+_CHECK_GIT_CHANGES_SH = """#!/bin/bash
+set -e
+
+if ! git rev-parse --is-inside-work-tree > /dev/null 2>&1; then
+  echo "check_git_changes: Not inside a git repository"
+  exit 1
+fi
+
+if [[ -n $(git status --porcelain) ]]; then
+  echo "check_git_changes: Uncommitted changes"
+  exit 1
+fi
+
+echo "check_git_changes: No uncommitted changes"
+exit 0
+
+"""
+
+_PREPARE_TMPL = string.Template("""#!/bin/bash
+set -e
+
+cd /home/$repo
+git reset --hard
+bash /home/check_git_changes.sh
+git checkout $sha
+bash /home/check_git_changes.sh
+
+
+""")
+
+_RUN_TMPL = string.Template("""#!/bin/bash
+set -e
+
+cd /home/$repo
+make distclean
+make -j4
+make test
+""")
+
+_TEST_RUN_TMPL = string.Template("""#!/bin/bash
+set -e
+
+cd /home/$repo
+git apply --whitespace=nowarn /home/test.patch
+make distclean
+make -j4
+make test
+
+""")
+
+_FIX_RUN_TMPL = string.Template("""#!/bin/bash
+set -e
+
+cd /home/$repo
+git apply --whitespace=nowarn /home/test.patch /home/fix.patch
+make distclean
+make -j4
+make test
+
+""")
 
 
 class ValkeyImageBase(Image):
@@ -34,6 +132,11 @@ class ValkeyImageBase(Image):
     def files(self) -> list[File]:
         return []
 
+    def dockerignore(self) -> str:
+        # Keep build artifacts out of the context when the repo source is
+        # COPY'd in; .git must stay because prepare.sh runs git checkout.
+        return "*.log\n**/*.o\n"
+
     def dockerfile(self) -> str:
         image_name = self.dependency()
         if isinstance(image_name, Image):
@@ -52,7 +155,7 @@ WORKDIR /home/
 ENV DEBIAN_FRONTEND=noninteractive
 ENV LANG=C.UTF-8
 ENV LC_ALL=C.UTF-8
-RUN apt update && apt install -y git make gcc pkg-config libjemalloc-dev build-essential autoconf automake libtool tcl tclx libssl-dev libpsl-dev
+RUN apt update && apt install -y --no-install-recommends ca-certificates git make gcc pkg-config libjemalloc-dev build-essential autoconf automake libtool tcl tclx libssl-dev libpsl-dev && rm -rf /var/lib/apt/lists/*
 
 {code}
 
@@ -119,6 +222,7 @@ class ValkeyImageDefault(Image):
     def __init__(self, pr: PullRequest, config: Config):
         self._pr = pr
         self._config = config
+        self._files: Optional[list[File]] = None
 
     @property
     def pr(self) -> PullRequest:
@@ -144,7 +248,10 @@ class ValkeyImageDefault(Image):
         return f"pr-{self.pr.number}"
 
     def files(self) -> list[File]:
-        return [
+        if self._files is not None:
+            return self._files
+
+        self._files = [
             File(
                 ".",
                 "fix.patch",
@@ -158,99 +265,46 @@ class ValkeyImageDefault(Image):
             File(
                 ".",
                 "check_git_changes.sh",
-                """#!/bin/bash
-set -e
-
-if ! git rev-parse --is-inside-work-tree > /dev/null 2>&1; then
-  echo "check_git_changes: Not inside a git repository"
-  exit 1
-fi
-
-if [[ -n $(git status --porcelain) ]]; then
-  echo "check_git_changes: Uncommitted changes"
-  exit 1
-fi
-
-echo "check_git_changes: No uncommitted changes"
-exit 0
-
-""".format(
-                    pr=self.pr
-                ),
+                _CHECK_GIT_CHANGES_SH,
             ),
             File(
                 ".",
                 "prepare.sh",
-                """#!/bin/bash
-set -e
-
-cd /home/{pr.repo}
-git reset --hard
-bash /home/check_git_changes.sh
-git checkout {pr.base.sha}
-bash /home/check_git_changes.sh
-
-
-""".format(
-                    pr=self.pr
-                ),
+                _PREPARE_TMPL.substitute(repo=self.pr.repo, sha=self.pr.base.sha),
             ),
             File(
                 ".",
                 "run.sh",
-                """#!/bin/bash
-set -e
-
-cd /home/{pr.repo}
-make distclean
-make -j4
-make test
-""".format(
-                    pr=self.pr
-                ),
+                _RUN_TMPL.substitute(repo=self.pr.repo),
             ),
             File(
                 ".",
                 "test-run.sh",
-                """#!/bin/bash
-set -e
-
-cd /home/{pr.repo}
-git apply --whitespace=nowarn /home/test.patch
-make distclean
-make -j4
-make test
-
-""".format(
-                    pr=self.pr
-                ),
+                _TEST_RUN_TMPL.substitute(repo=self.pr.repo),
             ),
             File(
                 ".",
                 "fix-run.sh",
-                """#!/bin/bash
-set -e
-
-cd /home/{pr.repo}
-git apply --whitespace=nowarn /home/test.patch /home/fix.patch
-make distclean
-make -j4
-make test
-
-""".format(
-                    pr=self.pr
-                ),
+                _FIX_RUN_TMPL.substitute(repo=self.pr.repo),
             ),
         ]
 
+        return self._files
+
     def dockerfile(self) -> str:
         image = self.dependency()
         name = image.image_name()
         tag = image.image_tag()
 
-        copy_commands = ""
+        # Per-PR patches go after the prepare layer so changing a patch
+        # does not invalidate the cached script and prepare layers.
+        script_copies = ""
+        patch_copies = ""
         for file in self.files():
-            copy_commands += f"COPY {file.name} /home/\n"
+            if file.name in ("fix.patch", "test.patch"):
+                patch_copies += f"COPY {file.name} /home/\n"
+            else:
+                script_copies += f"COPY {file.name} /home/\n"
 
         prepare_commands = "RUN bash /home/prepare.sh"
 
@@ -258,10 +312,12 @@ make test
 
 {self.global_env}
 
-{copy_commands}
+{script_copies}
 
 {prepare_commands}
 
+{patch_copies}
+
 {self.clear_env}
 
 """
@@ -290,44 +346,12 @@ class Valkey(Instance):
     def fix_patch_run(self) -> str:
         return "bash /home/fix-run.sh"
 
-    def parse_log(self, test_log: str) -> TestResult:
-        passed_tests = set()
-        failed_tests = set()
-        skipped_tests = set()
+    def parse_log(self, test_log: Union[str, bytes]) -> TestResult:
+        status = scan_log(_scan_chunk, test_log, merge_last_wins)
 
-        re_passes = [
-            re.compile(r"^\[ok\]: (.+?)( \(.+\))?$"),
-        ]
-        re_fails = [
-            re.compile(r"^\[err\]: (.+?)( \(.+\))?$"),
-            re.compile(r"^\[exception\]: (.+?)( \(.+\))?$"),
-        ]
-        # re_skips = [
-        #     re.compile(r"^\[ignore\]: (.+?)( \(.+\))?$"),
-        # ]
-
-        for line in test_log.splitlines():
-            line = line.strip()
-            if not line:
-                continue
-
-            for re_pass in re_passes:
-                pass_match = re_pass.match(line)
-                if pass_match:
-                    test = pass_match.group(1)
-                    passed_tests.add(test)
-
-            for re_fail in re_fails:
-                fail_match = re_fail.match(line)
-                if fail_match:
-                    test = fail_match.group(1)
-                    failed_tests.add(test)
-
-            # for re_skip in re_skips:
-            #     skip_match = re_skip.match(line)
-            #     if skip_match:
-            #         test = skip_match.group(1)
-            #         skipped_tests.add(test)
+        passed_tests = {t for t, s in status.items() if s == PASS}
+        failed_tests = {t for t, s in status.items() if s == FAIL}
+        skipped_tests = {t for t, s in status.items() if s == SKIP}
 
         return TestResult(
             passed_count=len(passed_tests),
@@ -1,9 +1,163 @@
-import re
+try:
+    import re2 as re  # DFA-based engine; linear time on large CI logs
+except ImportError:
+    import re
+import string
+import sys
 from typing import Optional, Union
 
 from multi_swe_bench.harness.image import Config, File, Image
 from multi_swe_bench.harness.instance import Instance, TestResult
 from multi_swe_bench.harness.pull_request import PullRequest
+from multi_swe_bench.utils.log_util import FAIL, PASS, SKIP, merge_fail_sticky, scan_log
+
+# One multiline pattern over the whole log; `[^\S\n]` pads where the old
+# per-line loop relied on `line.strip()`.
+# The literal `--- ` prefix is factored out so lines that cannot match
+# are rejected on one character.
+_ETCD_PATTERN = (
+    r"^[^\S\n]*"
+    r"(?:--- (?:PASS: (?P<passed>\S+)"
+    r"|FAIL: (?P<fail_a>\S+)"
+    r"|SKIP: (?P<skipped>\S+))"
+    r"|FAIL:?[^\S\n]?(?P<fail_b>.+?)[^\S\n])"
+)
+_ETCD_RE = re.compile(_ETCD_PATTERN, re.MULTILINE)
+# Bytes variant so callers holding raw container output can skip the
+# full decode pass; only matched test names are decoded.
+_ETCD_RE_B = re.compile(_ETCD_PATTERN.encode(), re.MULTILINE)
+
+
+def _get_base_name(test_name: str) -> str:
+    index = test_name.rfind("/")
+    if index == -1:
+        return test_name
+    return test_name[:index]
+
+
+def _scan_chunk(test_log: Union[str, bytes]) -> dict[str, int]:
+    is_bytes = isinstance(test_log, (bytes, bytearray))
+    pattern = _ETCD_RE_B if is_bytes else _ETCD_RE
+
+    status: dict[str, int] = {}
+    # Go table tests emit long runs of subtests under one parent; a
+    # single-slot cache skips the rfind + slice for those runs.
+    last_prefix = ""
+    last_base = ""
+    for match in pattern.finditer(test_log):
+        kind = match.lastgroup
+        name = match.group(kind)
+        if is_bytes:
+            name = name.decode("utf-8", errors="replace")
+        if (
+            last_prefix
+            and name.startswith(last_prefix)
+            and "/" not in name[len(last_prefix) :]
+        ):
+            base_name = last_base
+        else:
+            # Intern so subtests sharing a base name share one string
+            # object across the sets.
+            base_name = sys.intern(_get_base_name(name))
+            last_base = base_name
+            last_prefix = base_name + "/" if base_name != name else ""
+
+        if kind == "passed":
+            if status.get(base_name) != FAIL:
+                status[base_name] = PASS
+        elif kind in ("fail_a", "fail_b"):
+            status[base_name] = FAIL
+        else:
+            if status.get(base_name) != FAIL:
+                status[base_name] = SKIP
+    return status
+
+
+_CHECK_GIT_CHANGES_SH = """#!/bin/bash
+set -e
+
+if ! git rev-parse --is-inside-work-tree > /dev/null 2>&1; then
+  echo "check_git_changes: Not inside a git repository"
+  exit 1
+fi
+
+if [[ -n $(git status --porcelain) ]]; then
+  echo "check_git_changes: Uncommitted changes"
+  exit 1
+fi
+
+echo "check_git_changes: No uncommitted changes"
+exit 0
+
+"""
+
+_PREPARE_TMPL = string.Template("""#!/bin/bash
+set -e
+
+cd /home/$repo
+git reset --hard
+bash /home/check_git_changes.sh
+git checkout $sha
+bash /home/check_git_changes.sh
+
+bash /home/resolve_go_file.sh /home/$repo
+go test -v -count=1 ./... || true
+
+""")
+
+_RESOLVE_GO_FILE_SH = """#!/bin/bash
+
+if [ -z "$1" ]; then
+  echo "Usage: $0 <repository_path>"
+  exit 1
+fi
+
+REPO_PATH="$1"
+
+find "$REPO_PATH" -type f -name "*.go" | while read -r file; do
+  if [[ $(cat "$file") =~ ^[./a-zA-Z0-9_\-]+\.go$ ]]; then
+    echo "Checking $file"
+    target_path=$(cat "$file")
+    abs_target_path=$(realpath -m "$(dirname "$file")/$target_path")
+
+    if [ -f "$abs_target_path" ]; then
+      echo "Replacing $file with content from $abs_target_path"
+      cat "$abs_target_path" > "$file"
+    else
+      echo "Warning: Target file $abs_target_path does not exist for $file"
+    fi
+  fi
+done
+
+echo "Done!"
+
+"""
+
+_RUN_TMPL = string.Template("""#!/bin/bash
+set -e
+
+cd /home/$repo
+go test -v -count=1 ./...
+
+""")
+
+_TEST_RUN_TMPL = string.Template("""#!/bin/bash
+set -e
+
+cd /home/$repo
+git apply /home/test.patch
+go test -v -count=1 ./...
+
+""")
+
+_FIX_RUN_TMPL = string.Template("""#!/bin/bash
+set -e
+
+cd /home/$repo
+git apply /home/test.patch /home/fix.patch
+go test -v -count=1 ./...
+
+""")
 
 
 class EtcdImageBase(Image):
@@ -34,6 +188,11 @@ class EtcdImageBase(Image):
     def files(self) -> list[File]:
         return []
 
+    def dockerignore(self) -> str:
+        # Keep build artifacts out of the context when the repo source is
+        # COPY'd in; .git must stay because prepare.sh runs git checkout.
+        return "*.log\n**/bin/\n"
+
     def dockerfile(self) -> str:
         image_name = self.dependency()
         if isinstance(image_name, Image):
@@ -61,6 +220,7 @@ class EtcdImageDefault(Image):
     def __init__(self, pr: PullRequest, config: Config):
         self._pr = pr
         self._config = config
+        self._files: Optional[list[File]] = None
 
     @property
     def pr(self) -> PullRequest:
@@ -83,7 +243,10 @@ class EtcdImageDefault(Image):
         return f"pr-{self.pr.number}"
 
     def files(self) -> list[File]:
-        return [
+        if self._files is not None:
+            return self._files
+
+        self._files = [
             File(
                 ".",
                 "fix.patch",
@@ -97,138 +260,66 @@ class EtcdImageDefault(Image):
             File(
                 ".",
                 "check_git_changes.sh",
-                """#!/bin/bash
-set -e
-
-if ! git rev-parse --is-inside-work-tree > /dev/null 2>&1; then
-  echo "check_git_changes: Not inside a git repository"
-  exit 1
-fi
-
-if [[ -n $(git status --porcelain) ]]; then
-  echo "check_git_changes: Uncommitted changes"
-  exit 1
-fi
-
-echo "check_git_changes: No uncommitted changes"
-exit 0
-
-""".format(
-                    pr=self.pr
-                ),
+                _CHECK_GIT_CHANGES_SH,
             ),
             File(
                 ".",
                 "prepare.sh",
-                """#!/bin/bash
-set -e
-
-cd /home/{pr.repo}
-git reset --hard
-bash /home/check_git_changes.sh
-git checkout {pr.base.sha}
-bash /home/check_git_changes.sh
-
-bash /home/resolve_go_file.sh /home/{pr.repo}
-go test -v -count=1 ./... || true
-
-""".format(
-                    pr=self.pr
-                ),
+                _PREPARE_TMPL.substitute(repo=self.pr.repo, sha=self.pr.base.sha),
             ),
             File(
                 ".",
                 "resolve_go_file.sh",
-                """#!/bin/bash
-
-if [ -z "$1" ]; then
-  echo "Usage: $0 <repository_path>"
-  exit 1
-fi
-
-REPO_PATH="$1"
-
-find "$REPO_PATH" -type f -name "*.go" | while read -r file; do
-  if [[ $(cat "$file") =~ ^[./a-zA-Z0-9_\-]+\.go$ ]]; then
-    echo "Checking $file"
-    target_path=$(cat "$file")
-    abs_target_path=$(realpath -m "$(dirname "$file")/$target_path")
-
-    if [ -f "$abs_target_path" ]; then
-      echo "Replacing $file with content from $abs_target_path"
-      cat "$abs_target_path" > "$file"
-    else
-      echo "Warning: Target file $abs_target_path does not exist for $file"
-    fi
-  fi
-done
-
-echo "Done!"
-
-""",
+                _RESOLVE_GO_FILE_SH,
             ),
             File(
                 ".",
                 "run.sh",
-                """#!/bin/bash
-set -e
-
-cd /home/{pr.repo}
-go test -v -count=1 ./...
-
-""".format(
-                    pr=self.pr
-                ),
+                _RUN_TMPL.substitute(repo=self.pr.repo),
             ),
             File(
                 ".",
                 "test-run.sh",
-                """#!/bin/bash
-set -e
-
-cd /home/{pr.repo}
-git apply /home/test.patch
-go test -v -count=1 ./...
-
-""".format(
-                    pr=self.pr
-                ),
+                _TEST_RUN_TMPL.substitute(repo=self.pr.repo),
             ),
             File(
                 ".",
                 "fix-run.sh",
-                """#!/bin/bash
-set -e
-
-cd /home/{pr.repo}
-git apply /home/test.patch /home/fix.patch
-go test -v -count=1 ./...
-
-""".format(
-                    pr=self.pr
-                ),
+                _FIX_RUN_TMPL.substitute(repo=self.pr.repo),
             ),
         ]
 
+        return self._files
+
     def dockerfile(self) -> str:
         image = self.dependency()
         name = image.image_name()
         tag = image.image_tag()
 
-        copy_commands = ""
+        # Per-PR patches go after the prepare layer so changing a patch
+        # does not invalidate the cached script and prepare layers.
+        script_copies = ""
+        patch_copies = ""
         for file in self.files():
-            copy_commands += f"COPY {file.name} /home/\n"
+            if file.name in ("fix.patch", "test.patch"):
+                patch_copies += f"COPY {file.name} /home/\n"
+            else:
+                script_copies += f"COPY {file.name} /home/\n"
 
+        # No cache mount here: builds go through docker-py's api.build,
+        # which only drives the legacy builder and rejects RUN --mount.
         prepare_commands = "RUN bash /home/prepare.sh"
 
         return f"""FROM {name}:{tag}
 
 {self.global_env}
 
-{copy_commands}
+{script_copies}
 
 {prepare_commands}
 
+{patch_copies}
+
 {self.clear_env}
 
 """
@@ -257,50 +348,12 @@ class Etcd(Instance):
     def fix_patch_run(self) -> str:
         return "bash /home/fix-run.sh"
 
-    def parse_log(self, test_log: str) -> TestResult:
-        passed_tests = set()
-        failed_tests = set()
-        skipped_tests = set()
+    def parse_log(self, test_log: Union[str, bytes]) -> TestResult:
+        status = scan_log(_scan_chunk, test_log, merge_fail_sticky)
 
-        re_pass_tests = [re.compile(r"--- PASS: (\S+)")]
-        re_fail_tests = [
-            re.compile(r"--- FAIL: (\S+)"),
-            re.compile(r"FAIL:?\s?(.+?)\s"),
-        ]
-        re_skip_tests = [re.compile(r"--- SKIP: (\S+)")]
-
-        def get_base_name(test_name: str) -> str:
-            index = test_name.rfind("/")
-            if index == -1:
-                return test_name
-            return test_name[:index]
-
-        for line in test_log.splitlines():
-            line = line.strip()
-
-            for re_pass_test in re_pass_tests:
-                pass_match = re_pass_test.match(line)
-                if pass_match:
-                    test_name = pass_match.group(1)
-                    if test_name not in failed_tests:
-                        passed_tests.add(get_base_name(test_name))
-
-            for re_fail_test in re_fail_tests:
-                fail_match = re_fail_test.match(line)
-                if fail_match:
-                    test_name = fail_match.group(1)
-                    if test_name in passed_tests:
-                        passed_tests.remove(test_name)
-                    if test_name in skipped_tests:
-                        skipped_tests.remove(test_name)
-                    failed_tests.add(get_base_name(test_name))
-
-            for re_skip_test in re_skip_tests:
-                skip_match = re_skip_test.match(line)
-                if skip_match:
-                    test_name = skip_match.group(1)
-                    if test_name not in failed_tests:
-                        skipped_tests.add(get_base_name(test_name))
+        passed_tests = {t for t, s in status.items() if s == PASS}
+        failed_tests = {t for t, s in status.items() if s == FAIL}
+        skipped_tests = {t for t, s in status.items() if s == SKIP}
 
         return TestResult(
             passed_count=len(passed_tests),
@@ -1,9 +1,118 @@
-import re
+try:
+    import re2 as re  # DFA-based engine; linear time on large CI logs
+except ImportError:
+    import re
+import string
+import sys
 from typing import Optional, Union
 
 from multi_swe_bench.harness.image import Config, File, Image
 from multi_swe_bench.harness.instance import Instance, TestResult
 from multi_swe_bench.harness.pull_request import PullRequest
+from multi_swe_bench.utils.log_util import FAIL, PASS, SKIP, merge_fail_sticky, scan_log
+
+# One multiline pattern over the whole log; `[^\S\n]` pads for indented
+# lines. CRLF is normalized away in one pass before scanning, so the
+# pattern does not need a per-line `\r?`. The literal `> Task :` prefix
+# is factored out so task lines are matched with one literal comparison.
+_LOGSTASH_PATTERN = (
+    r"^[^\S\n]*"
+    r"(?:> Task :(?:(?P<ptask>\S+)(?: UP-TO-DATE)?"
+    r"|(?P<ftask>\S+) FAILED"
+    r"|(?P<stask>\S+) (?:SKIPPED|NO-SOURCE))"
+    r"|(?P<ptest>.+ > .+) PASSED"
+    r"|(?P<ftest>.+ > .+) FAILED"
+    r"|(?P<stest>.+ > .+) SKIPPED)$"
+)
+_LOGSTASH_RE = re.compile(_LOGSTASH_PATTERN, re.MULTILINE)
+# Bytes variant so callers holding raw container output can skip the
+# full decode pass; only matched test names are decoded.
+_LOGSTASH_RE_B = re.compile(_LOGSTASH_PATTERN.encode(), re.MULTILINE)
+
+
+def _scan_chunk(test_log: Union[str, bytes]) -> dict[str, int]:
+    is_bytes = isinstance(test_log, (bytes, bytearray))
+    pattern = _LOGSTASH_RE_B if is_bytes else _LOGSTASH_RE
+
+    status: dict[str, int] = {}
+    for m in pattern.finditer(test_log):
+        kind = m.lastgroup
+        name = m.group(kind)
+        if is_bytes:
+            name = name.decode("utf-8", errors="replace")
+        # Repeated names collapse to one string object across the sets.
+        name = sys.intern(name)
+
+        if kind in ("ptask", "ptest"):
+            if status.get(name) != FAIL:
+                status[name] = PASS
+        elif kind in ("ftask", "ftest"):
+            status[name] = FAIL
+        else:
+            # Fail-sticky like merge_fail_sticky, so chunked and
+            # single-process scans agree when a SKIPPED line follows a
+            # FAILED one for the same name.
+            if status.get(name) != FAIL:
+                status[name] = SKIP
+    return status
+
+
+_CHECK_GIT_CHANGES_SH = """#!/bin/bash
+set -e
+
+if ! git rev-parse --is-inside-work-tree > /dev/null 2>&1; then
+  echo "check_git_changes: Not inside a git repository"
+  exit 1
+fi
+
+if [[ -n $(git status --porcelain) ]]; then
+  echo "check_git_changes: Uncommitted changes"
+  exit 1
+fi
+
+echo "check_git_changes: No uncommitted changes"
+exit 0
+
+"""
+
+_PREPARE_TMPL = string.Template("""#!/bin/bash
+set -e
+
+cd /home/$repo
+git reset --hard
+bash /home/check_git_changes.sh
+git checkout $sha
+bash /home/check_git_changes.sh
+
+./gradlew clean test --continue || true
+
+""")
+
+_RUN_TMPL = string.Template("""#!/bin/bash
+set -e
+
+cd /home/$repo
+./gradlew clean test --continue
+
+""")
+
+_TEST_RUN_TMPL = string.Template("""#!/bin/bash
+set -e
+
+cd /home/$repo
+git apply /home/test.patch
+./gradlew clean test --continue
+
+""")
+
+_FIX_RUN_TMPL = string.Template("""#!/bin/bash
+set -e
+
+cd /home/$repo
+git apply /home/test.patch /home/fix.patch
+./gradlew clean test --continue
+
+""")
 
 
 class LogstashImageBase(Image):
@@ -63,6 +172,11 @@ fi
             )
         ]
 
+    def dockerignore(self) -> str:
+        # Keep build artifacts out of the context when the repo source is
+        # COPY'd in; .git must stay because prepare.sh runs git checkout.
+        return "*.log\n**/.gradle/\n**/build/\n"
+
     def dockerfile(self) -> str:
         image_name = self.dependency()
         if isinstance(image_name, Image):
@@ -107,6 +221,7 @@ class LogstashImageDefault(Image):
     def __init__(self, pr: PullRequest, config: Config):
         self._pr = pr
         self._config = config
+        self._files: Optional[list[File]] = None
 
     @property
     def pr(self) -> PullRequest:
@@ -129,7 +244,10 @@ class LogstashImageDefault(Image):
         return f"pr-{self.pr.number}"
 
     def files(self) -> list[File]:
-        return [
+        if self._files is not None:
+            return self._files
+
+        self._files = [
             File(
                 ".",
                 "fix.patch",
@@ -143,95 +261,46 @@ class LogstashImageDefault(Image):
             File(
                 ".",
                 "check_git_changes.sh",
-                """#!/bin/bash
-set -e
-
-if ! git rev-parse --is-inside-work-tree > /dev/null 2>&1; then
-  echo "check_git_changes: Not inside a git repository"
-  exit 1
-fi
-
-if [[ -n $(git status --porcelain) ]]; then
-  echo "check_git_changes: Uncommitted changes"
-  exit 1
-fi
-
-echo "check_git_changes: No uncommitted changes"
-exit 0
-
-""".format(
-                    pr=self.pr
-                ),
+                _CHECK_GIT_CHANGES_SH,
             ),
             File(
                 ".",
                 "prepare.sh",
-                """#!/bin/bash
-set -e
-
-cd /home/{pr.repo}
-git reset --hard
-bash /home/check_git_changes.sh
-git checkout {pr.base.sha}
-bash /home/check_git_changes.sh
-
-./gradlew clean test --continue || true
-
-""".format(
-                    pr=self.pr
-                ),
+                _PREPARE_TMPL.substitute(repo=self.pr.repo, sha=self.pr.base.sha),
             ),
             File(
                 ".",
                 "run.sh",
-                """#!/bin/bash
-set -e
-
-cd /home/{pr.repo}
-./gradlew clean test --continue
-
-""".format(
-                    pr=self.pr
-                ),
+                _RUN_TMPL.substitute(repo=self.pr.repo),
             ),
             File(
                 ".",
                 "test-run.sh",
-                """#!/bin/bash
-set -e
-
-cd /home/{pr.repo}
-git apply /home/test.patch
-./gradlew clean test --continue
-
-""".format(
-                    pr=self.pr
-                ),
+                _TEST_RUN_TMPL.substitute(repo=self.pr.repo),
             ),
             File(
                 ".",
                 "fix-run.sh",
-                """#!/bin/bash
-set -e
-
-cd /home/{pr.repo}
-git apply /home/test.patch /home/fix.patch
-./gradlew clean test --continue
-
-""".format(
-                    pr=self.pr
-                ),
+                _FIX_RUN_TMPL.substitute(repo=self.pr.repo),
             ),
         ]
 
+        return self._files
+
     def dockerfile(self) -> str:
         image = self.dependency()
         name = image.image_name()
         tag = image.image_tag()
 
-        copy_commands = ""
+        # Per-PR patches go after the prepare layer so changing a patch
+        # does not invalidate the cached script and prepare layers.
+        script_copies = ""
+        patch_copies = ""
         for file in self.files():
-            copy_commands += f"COPY {file.name} /home/\n"
+            if file.name in ("fix.patch", "test.patch"):
+                patch_copies += f"COPY {file.name} /home/\n"
+            else:
+                script_copies += f"COPY {file.name} /home/\n"
 
         prepare_commands = "RUN bash /home/prepare.sh"
 
@@ -239,10 +308,12 @@ git apply /home/test.patch /home/fix.patch
 
 {self.global_env}
 
-{copy_commands}
+{script_copies}
 
 {prepare_commands}
 
+{patch_copies}
+
 {self.clear_env}
 
 """
@@ -271,45 +342,17 @@ class Logstash(Instance):
     def fix_patch_run(self) -> str:
         return "bash /home/fix-run.sh"
 
-    def parse_log(self, test_log: str) -> TestResult:
-        passed_tests = set()
-        failed_tests = set()
-        skipped_tests = set()
-
-        passed_res = [
-            re.compile(r"^> Task :(\S+)$"),
-            re.compile(r"^> Task :(\S+) UP-TO-DATE$"),
-            re.compile(r"^(.+ > .+) PASSED$"),
-        ]
-
-        failed_res = [
-            re.compile(r"^> Task :(\S+) FAILED$"),
-            re.compile(r"^(.+ > .+) FAILED$"),
-        ]
-
-        skipped_res = [
-            re.compile(r"^> Task :(\S+) SKIPPED$"),
-            re.compile(r"^> Task :(\S+) NO-SOURCE$"),
-            re.compile(r"^(.+ > .+) SKIPPED$"),
-        ]
+    def parse_log(self, test_log: Union[str, bytes]) -> TestResult:
+        # One C-level pass instead of tolerating \r at every line end.
+        if isinstance(test_log, (bytes, bytearray)):
+            test_log = test_log.replace(b"\r\n", b"\n")
+        else:
+            test_log = test_log.replace("\r\n", "\n")
+        status = scan_log(_scan_chunk, test_log, merge_fail_sticky)
 
-        for line in test_log.splitlines():
-            for passed_re in passed_res:
-                m = passed_re.match(line)
-                if m and m.group(1) not in failed_tests:
-                    passed_tests.add(m.group(1))
-
-            for failed_re in failed_res:
-                m = failed_re.match(line)
-                if m:
-                    failed_tests.add(m.group(1))
-                    if m.group(1) in passed_tests:
-                        passed_tests.remove(m.group(1))
-
-            for skipped_re in skipped_res:
-                m = skipped_re.match(line)
-                if m:
-                    skipped_tests.add(m.group(1))
+        passed_tests = {t for t, s in status.items() if s == PASS}
+        failed_tests = {t for t, s in status.items() if s == FAIL}
+        skipped_tests = {t for t, s in status.items() if s == SKIP}
 
         return TestResult(
             passed_count=len(passed_tests),
@@ -16,7 +16,11 @@ def exists(image_name: str) -> bool:
 
 
 def build(
-    workdir: Path, dockerfile_name: str, image_full_name: str, logger: logging.Logger
+    workdir: Path,
+    dockerfile_name: str,
+    image_full_name: str,
+    logger: logging.Logger,
+    cache_from: Optional[str] = None,
 ):
     workdir = str(workdir)
     logger.info(
@@ -31,6 +35,11 @@ def build(
             forcerm=True,
             decode=True,
             encoding="utf-8",
+            # Reuse unchanged layers from a previously cached image; the
+            # inline-cache build arg makes the result usable as a cache
+            # source itself.
+            cache_from=[cache_from] if cache_from else None,
+            buildargs={"BUILDKIT_INLINE_CACHE": "1"} if cache_from else None,
         )
 
         for log in build_logs:
@@ -54,6 +63,10 @@ def build(
         raise e
 
 
+def tag(image_full_name: str, target: str):
+    docker_client.images.get(image_full_name).tag(target)
+
+
 def run(
     image_full_name: str,
     run_command: str,
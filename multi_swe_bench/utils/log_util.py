@@ -0,0 +1,61 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Union
+
+PASS, FAIL, SKIP = range(3)
+
+# Logs below this size are scanned in-process; forking workers only pays
+# off once the regex scan itself dominates.
+_PARALLEL_THRESHOLD = 1 << 20
+
+
+def split_log(test_log: Union[str, bytes], parts: int) -> list:
+    """Split a log into roughly equal chunks, cutting only at newlines."""
+    newline = b"\n" if isinstance(test_log, (bytes, bytearray)) else "\n"
+    size = len(test_log)
+    chunks = []
+    start = 0
+    for i in range(1, parts):
+        cut = test_log.find(newline, max(start, i * size // parts))
+        if cut == -1:
+            break
+        cut += 1
+        chunks.append(test_log[start:cut])
+        start = cut
+
+    if start < size:
+        chunks.append(test_log[start:])
+
+    return chunks
+
+
+def merge_last_wins(status: dict[str, int], chunk_status: dict[str, int]):
+    """Later chunks overwrite earlier ones, like a sequential scan."""
+    status.update(chunk_status)
+
+
+def merge_fail_sticky(status: dict[str, int], chunk_status: dict[str, int]):
+    """Like merge_last_wins, but a FAIL is never downgraded."""
+    for name, chunk_state in chunk_status.items():
+        if chunk_state == FAIL or status.get(name) != FAIL:
+            status[name] = chunk_state
+
+
+def scan_log(
+    scan_chunk: Callable[[Union[str, bytes]], dict[str, int]],
+    test_log: Union[str, bytes],
+    merge_chunk: Callable[[dict[str, int], dict[str, int]], None],
+) -> dict[str, int]:
+    """Run scan_chunk over a log, fanning out to worker processes for
+    large logs. scan_chunk must be a module-level function so it can be
+    pickled into the workers."""
+    workers = os.cpu_count() or 1
+    if workers == 1 or len(test_log) < _PARALLEL_THRESHOLD:
+        return scan_chunk(test_log)
+
+    status: dict[str, int] = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for chunk_status in pool.map(scan_chunk, split_log(test_log, workers)):
+            merge_chunk(status, chunk_status)
+
+    return status
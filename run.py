@@ -371,8 +371,13 @@ class Main:
     def main(self):
         for hook in self.hooks:
             hook.on_start()
-        for instance_id in self.env.data.keys():
+        instance_ids = list(self.env.data.keys())
+        for i, instance_id in enumerate(instance_ids):
             try:
+                # Kick off the next instance's image build so it overlaps
+                # with this run; reset() picks up the finished future.
+                if not self.env.prebuild and i + 1 < len(instance_ids):
+                    self.env.prefetch(instance_ids[i + 1])
                 self.run(instance_id)
             except _ContinueLoop:
                 continue
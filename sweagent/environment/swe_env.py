@@ -1,21 +1,25 @@
 from __future__ import annotations
 
-import datetime
+import atexit
 import hashlib
+import io
 import json
 import os
-import random
 import re
+import secrets
+import shlex
 import subprocess
+import tarfile
+import threading
 import time
 import traceback
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import cached_property, lru_cache
 from pathlib import Path
 from typing import Any
 
 import gymnasium as gym
-import yaml
-from ghapi.all import GhApi
 from git import Repo
 from simple_parsing.helpers.serialization.serializable import FrozenSerializable
 from simple_parsing.helpers.fields import field
@@ -51,6 +55,48 @@ AGENT_ACTION_NO_OUTPUT_TIMEOUT = float(keys_config.get("SWE_AGENT_ACTION_NO_OUTP
 PATH_TO_REQS = "/root/requirements.txt"
 PATH_TO_ENV_YML = "/root/environment.yml"
 
+# Pre-encoded once; sent after every command via a vectored write.
+COMMAND_SUFFIX_BYTES = f"echo {PROCESS_DONE_MARKER_START}$?{PROCESS_DONE_MARKER_END}\n".encode()
+
+_SUBMISSION_RE = re.compile(r"\<\<SUBMISSION\|\|(.*)\|\|SUBMISSION\>\>", re.DOTALL)
+
+
+# Both are idempotent for a given URL and the first does a GitHub REST
+# call; memoizing makes open_pr retries free.
+_cached_gh_issue_data = lru_cache(maxsize=128)(get_gh_issue_data)
+_cached_parse_gh_issue_url = lru_cache(maxsize=128)(parse_gh_issue_url)
+
+
+# Image removals are REST round-trips plus filesystem unlinks; running
+# them off-thread lets the next instance start while cleanup proceeds.
+_image_removal_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="image-removal")
+atexit.register(_image_removal_executor.shutdown, wait=True)
+
+
+# Helper processes of the shell itself that interrupt() must never kill.
+# Kept as bytes so get_pids can filter before decoding.
+_SKIP_COMMS = frozenset({b"ps", b"npm", b"yarn", b"sh"})
+
+
+@lru_cache(maxsize=32)
+def _load_environment_yaml(path: str, mtime: float) -> dict:
+    """Parse an environment-setup yaml once per (path, mtime); batched runs
+    construct one SWEEnv per instance over the same config file."""
+    import yaml
+
+    try:
+        from yaml import CSafeLoader as _Loader  # libyaml, ~5x faster
+    except ImportError:
+        from yaml import SafeLoader as _Loader
+    return yaml.load(Path(path).read_text(), Loader=_Loader)
+
+
+@lru_cache(maxsize=32)
+def _except_error_pattern(except_error_msgs: tuple[str, ...]) -> re.Pattern:
+    """Compile tolerated error strings into one alternation so matching is a
+    single pass over the logs rather than one substring scan per string."""
+    return re.compile("|".join(re.escape(msg) for msg in except_error_msgs))
+
 
 @dataclass(frozen=True)
 class EnvironmentArguments(FrozenSerializable):
@@ -137,6 +183,10 @@ class SWEEnv(gym.Env):
     name = "swe_main"
     # This prefix will be prepended to the image name when caching task images
     cached_image_prefix = "swe-agent-task-env-"
+    # One docker client shared by all environments; constructing one does an
+    # API version handshake against the daemon, so do it once.
+    _docker_client: docker.DockerClient | None = None
+    _docker_client_lock = threading.Lock()
 
     def __init__(self, args: EnvironmentArguments, log_dir: Path = None):
         super().__init__()
@@ -166,17 +216,17 @@ class SWEEnv(gym.Env):
             self.logger.exception("Failed to get commit hash for this repo: %s", str(e))
 
         self._github_token: str = keys_config.get("GITHUB_TOKEN", "")  # type: ignore
+        # Resolved once; _communicate and _copy_repo run thousands of times
+        # per episode and should not re-validate the config choice each call.
+        self._communicate_method: str = keys_config.get(
+            "SWE_AGENT_COMMUNICATE_METHOD", default="end-marker", choices=["end-marker", "processes"]
+        )  # type: ignore
+        self._clone_method: str = keys_config.get("SWE_AGENT_CLONE_METHOD", default="sparse", choices=["sparse", "full"])  # type: ignore
 
-        # Load Task Instances
+        # Task instances are loaded lazily via the `data` property.
         self.data_path = self.args.cli_args.pr_file
-        self.data = get_instances(
-            self.data_path,
-            cli_args=self.args.cli_args,
-            prebuild=self.prebuild
-        )
         #: Instance we're currently processing. Gets set in self.reset.
         self.record: Record | None = None
-        self.logger.info(f"💽 Loaded dataset from {self.data_path}")
 
         # Establish connection with execution container
         self.image_name = None
@@ -187,18 +237,45 @@ class SWEEnv(gym.Env):
         self.idx = 0
         self.clean_multi_line_functions = lambda x: x
         self.hooks: list[EnvHook] = []
+        self._cached_task_image_names: dict[tuple[str, ...], str] = {}
+        # Env names seen by `conda env list`; None means not fetched yet.
+        self._conda_envs: set[str] | None = None
+        # Background image builds started via prefetch(), keyed by instance id.
+        self._build_executor: ThreadPoolExecutor | None = None
+        self._build_futures: dict[str, Future] = {}
 
         self.logger.debug("Environment initialization took %.2f seconds", time.perf_counter() - t0)
 
+    @cached_property
+    def data(self) -> dict[str, Record]:
+        """Task instances, loaded (and optionally prebuilt) on first access
+        instead of in __init__, so constructing an environment stays cheap
+        when only a few instances are ever touched."""
+        data = get_instances(
+            self.data_path,
+            cli_args=self.args.cli_args,
+            prebuild=self.prebuild
+        )
+        self.logger.info(f"💽 Loaded dataset from {self.data_path}")
+        return data
+
     def _get_cached_task_image_name(self) -> str:
         assert self.record is not None
-        inputs: list[str] = [
+        inputs: tuple[str, ...] = (
             self.record.instance.pr.repo,
             self.record.instance.pr.base.sha,
             self.args.environment_setup or "no_setup",
-        ]
-        tag = hashlib.sha256("".join(inputs).encode()).hexdigest()[:50]
-        return f"{self.cached_image_prefix}{tag}"
+        )
+        # The inputs are immutable once the record is set, so hash each
+        # combination only once per environment.
+        cached = self._cached_task_image_names.get(inputs)
+        if cached is None:
+            # Uniqueness tag, not an integrity hash; blake2b is faster and
+            # a 25-byte digest gives the same 50 hex chars as before.
+            tag = hashlib.blake2b("".join(inputs).encode(), digest_size=25).hexdigest()
+            cached = f"{self.cached_image_prefix}{tag}"
+            self._cached_task_image_names[inputs] = cached
+        return cached
 
     def add_hook(self, hook: EnvHook):
         """Add `EnvHook` to the environment.
@@ -228,7 +305,7 @@ class SWEEnv(gym.Env):
         # fixme: This if statement is brittle and should probably be replaced with better logic
         self.logger.info("Trying to clone from non-mirror...")
         clone_url = f"https://{token_prefix}github.com/{self.record.instance.pr.repo}.git"
-        clone_method = keys_config.get("SWE_AGENT_CLONE_METHOD", default="sparse", choices=["sparse", "full"])
+        clone_method = self._clone_method
         if len(self.data) > 1 or self.persistent:
             msg = "Falling back to full cloning method due to multiple instances or persistent container"
             self.logger.debug(msg)
@@ -237,6 +314,7 @@ class SWEEnv(gym.Env):
                 input=f"git clone {clone_url} {self._repo_name}",
                 error_msg="Failed to clone repository from conservative method",
                 timeout_duration=LONG_TIMEOUT,
+                check_syntax=False,
             )
         else:
             base_commit = self.record.instance.pr.base.sha
@@ -247,13 +325,17 @@ class SWEEnv(gym.Env):
                         f"cd {self._repo_name}",
                         "git init",
                         f"git remote add origin {clone_url}",
-                        f"git fetch --depth 1 origin {base_commit}",
+                        # Partial clone: defer blob download to checkout so
+                        # only blobs reachable from the base commit transfer.
+                        "git config fetch.negotiationAlgorithm skipping",
+                        f"git -c protocol.version=2 fetch --depth 1 --filter=blob:none --no-tags origin {base_commit}",
                         "git checkout FETCH_HEAD",
                         "cd ..",
                     )
                 ),
                 error_msg="Failed to clone repository with fast method",
                 timeout_duration=LONG_TIMEOUT,
+                check_syntax=False,
             )
         return self._repo_name
 
@@ -281,83 +363,100 @@ class SWEEnv(gym.Env):
 
         # Set query, gold command
         self.base_commit = self.record.instance.pr.base.sha
-        self.query = 'TITLE:\n' + self.record.instance.pr.resolved_issues[0].title + '\n CONTENT:\n' + self.record.instance.pr.resolved_issues[0].body
+        issue = self.record.instance.pr.resolved_issues[0]
+        self.query = f"TITLE:\n{issue.title}\n CONTENT:\n{issue.body}"
         self.reward = None
 
         # build images
         if not self.prebuild:
-            self._build_image()
+            self._build_image(instance_id)
 
         ### Reset Container ###
         self._reset_container(instance_id)
 
         # Clone repository if not already cloned
-        self.communicate(input="cd /home")
-        folders = self.communicate(input="ls").split("\n")
-        assert self._repo_name in folders
+        self.communicate(input="cd /home", check_syntax=False)
+        # O(1) existence check instead of transferring every entry of /home.
+        folder_check = self.communicate(f'[ -d "/home/{self._repo_name}" ] && echo OK', check_syntax=False)
+        assert folder_check.strip() == "OK"
 
         # Clean repository of any modifications + Checkout base commit
-        for cmd in [
-            "echo -n > /root/files_to_edit.txt",
-            f"cd {self._repo_name}",
-            "export ROOT=$(pwd -P)",
-            "git status",
+        self._communicate_batch(
+            [
+                "echo -n > /root/files_to_edit.txt",
+                f"cd {self._repo_name}",
+                "export ROOT=$(pwd -P)",
+            ],
+            error_msg="Failed to enter repository",
+            check_syntax=False,
+        )
+        # `git restore` does not exist on git < 2.23; its failure is
+        # tolerated, so it must run as its own round-trip — inside an
+        # `&&` chain a tolerated failure would abort the reset and clean
+        # below while still being reported as success.
+        self.communicate_with_handling(
             "git restore .",
-            f"git reset --hard {self.base_commit}",
-            "git clean -fdxq",
-        ]:
-            log = self.communicate_with_handling(
-                input=cmd,
-                error_msg="Failed to clean repository",
-                except_error_msgs=['fatal', 'not a git command'],
-                timeout_duration=LONG_TIMEOUT,
-            )
+            error_msg="Failed to restore repository",
+            except_error_msgs=['fatal', 'not a git command'],
+            timeout_duration=LONG_TIMEOUT,
+            check_syntax=False,
+        )
+        self._communicate_batch(
+            [
+                f"git reset --hard {self.base_commit}",
+                "git clean -fdxq",
+            ],
+            error_msg="Failed to clean repository",
+            timeout_duration=LONG_TIMEOUT,
+            check_syntax=False,
+        )
 
         # pre-install dependencies for swe-agent ACI tools
-        for cmd in [
-            "apt-get update",
-            'apt-get install -y jq'
-        ]:
-            self.communicate_with_handling(
-                input=cmd,
-                error_msg="Failed to install",
-                timeout_duration=LONG_TIMEOUT,
-                no_output_timeout_duration=LONG_TIMEOUT
-            )
+        self._communicate_batch(
+            [
+                "apt-get update",
+                'apt-get install -y jq',
+            ],
+            error_msg="Failed to install",
+            timeout_duration=LONG_TIMEOUT,
+            no_output_timeout_duration=LONG_TIMEOUT,
+            check_syntax=False,
+        )
 
         # update .gitignore files
         source_file = Path(REPO_ROOT) / "multi_swe_bench" / "utils" / "gitignores"/ f"{self.record.language}.sh"
         copy_anything_to_container(self.container_obj, str(source_file), "/home/ignore.sh")
-        self.communicate('chmod +x /home/ignore.sh')
+        self.communicate('chmod +x /home/ignore.sh', check_syntax=False)
         self.communicate_with_handling(
             input="bash ../ignore.sh",
-            error_msg="Failed to source ignore files"
+            error_msg="Failed to source ignore files",
+            check_syntax=False,
         )
 
         # Reset environment variables
-        for cmd in [
-            'export CURRENT_FILE=""',
-            "export CURRENT_LINE=0",
-            "export SEARCH_RESULTS=()",
-            "export SEARCH_FILES=()",
-            "export SEARCH_INDEX=0",
-        ]:
-            self.communicate_with_handling(
-                input=cmd,
-                error_msg="Failed to reset environment variables",
-            )
+        self._communicate_batch(
+            [
+                'export CURRENT_FILE=""',
+                "export CURRENT_LINE=0",
+                "export SEARCH_RESULTS=()",
+                "export SEARCH_FILES=()",
+                "export SEARCH_INDEX=0",
+            ],
+            error_msg="Failed to reset environment variables",
+            check_syntax=False,
+        )
 
-        system = self.communicate("uname -s").strip().lower()
-        arch = self.communicate("uname -m").strip().lower()
+        system, _, arch = self.communicate('echo "$(uname -s) $(uname -m)"', check_syntax=False).strip().lower().partition(" ")
         if system == "linux" and arch == "x86_64":
             self.communicate_with_handling(
                 "apt update --allow-insecure-repositories ; apt install build-essential -y --allow-unauthenticated",
                 error_msg="Failed to install build-essential",
                 timeout_duration=LONG_TIMEOUT,
+                check_syntax=False,
             )
 
         # remove the fix.patch if it exists
-        self.communicate('rm /home/fix.patch')
+        self.communicate('rm /home/fix.patch', check_syntax=False)
         # Write any metadata to info if necessary
         return None, info
 
@@ -366,19 +465,14 @@ class SWEEnv(gym.Env):
         Apply test patch for oracle setting
         """
         assert self.record is not None
-        path_to_patch = "test.patch"
-        with open(path_to_patch, "w") as f:
-            f.write(self.record.instance.pr.test_patch)
-        subprocess.run(
-            f"docker cp {path_to_patch} {self.container_name}:/root/test.patch",
-            shell=True,
-            check=False,
-        )
+        assert self.container_obj is not None
+        # Push the patch through the daemon socket instead of writing it to
+        # disk and forking a docker cp subprocess.
+        copy_file_to_container(self.container_obj, self.record.instance.pr.test_patch, "/root/test.patch")
         self.communicate_with_handling(
             input="git apply /root/test.patch",
             error_msg="Failed to apply test patch correctly",
         )
-        os.remove(path_to_patch)
 
     def step(self, action: str) -> tuple[str | None, int, bool, dict]:
         """
@@ -425,22 +519,32 @@ class SWEEnv(gym.Env):
         # Attempt to run action in container
         observation = ""
         try:
+            # Cap buffering during the read itself; the observation is
+            # truncated to 40k chars below anyway, so the middle of giant
+            # outputs never needs to cross the pipe buffer into Python.
             observation = self.communicate(
                 input=action, 
                 timeout_duration=LONG_TIMEOUT, 
-                no_output_timeout_duration=AGENT_ACTION_NO_OUTPUT_TIMEOUT
+                no_output_timeout_duration=AGENT_ACTION_NO_OUTPUT_TIMEOUT,
+                max_bytes=100_000,
             )
         except TimeoutError as e:
+            # Collect the pieces and join once instead of repeated +=.
+            parts = [observation]
+            if len(e.args) > 1:
+                parts.append(e.args[1])
             try:
-                observation += e.args[1] if len(e.args) > 1 else ""
-                observation += self.interrupt()
-                observation += "\nEXECUTION TIMED OUT"
-                observation += (
-                    f" BECAUSE NO OUTPUT WAS PRODUCED FOR MORE THAN 500 SECONDS.\nPLEASE REFINE YOUR RUNNING COMMAND SO IT WILL PRODUCE OUTPUT IN THE SPECIFIED TIME FRAME."
+                parts.append(self.interrupt())
+                parts.append("\nEXECUTION TIMED OUT")
+                parts.append(
+                    " BECAUSE NO OUTPUT WAS PRODUCED FOR MORE THAN 500 SECONDS.\nPLEASE REFINE YOUR RUNNING COMMAND SO IT WILL PRODUCE OUTPUT IN THE SPECIFIED TIME FRAME."
                 )
+                observation = "".join(parts)
             except RuntimeError as e:
-                observation += e.args[1] if len(e.args) > 1 else ""
-                observation += "\nEXECUTION TIMED OUT AND INTERRUPT FAILED."
+                if len(e.args) > 1:
+                    parts.append(e.args[1])
+                parts.append("\nEXECUTION TIMED OUT AND INTERRUPT FAILED.")
+                observation = "".join(parts)
                 info["exit_status"] = "early_exit"
                 self.logger.warning(f"Failed to interrupt container: {e}\n")
                 self.close()
@@ -461,9 +565,11 @@ class SWEEnv(gym.Env):
             observation += "\nEXECUTION FAILED OR COMMAND MALFORMED"
             self.logger.exception("Unknown exception")
 
-        # truncate observation, in case some test information is too large
+        # truncate observation, in case some test information is too large;
+        # this runs before get_submission so the regex never scans more
+        # than 40k characters.
         if len(observation) > 40000:
-            observation = observation[:20000] + "..." + observation[-20000:]
+            observation = f"{observation[:20000]}...{observation[-20000:]}"
 
 
         # Record submission and end episode if `submit` keyword found
@@ -521,13 +627,40 @@ class SWEEnv(gym.Env):
 
     # MARK: Helper functions #
 
-    def _build_image(self) -> None:
+    def prefetch(self, instance_id: str) -> None:
+        """Start building the image for an upcoming instance in the background.
+
+        The docker daemon does the heavy lifting, so a thread is enough to
+        overlap the build with the currently running instance. _build_image
+        picks up the future instead of building again.
+        """
+        if instance_id in self._build_futures:
+            return
+        if self._build_executor is None:
+            self._build_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="build-image")
+        instance = self.data[instance_id].instance
+        self._build_futures[instance_id] = self._build_executor.submit(
+            build_image,
+            instance.dependency(),
+            cli=self.args.cli_args,
+            logger=self.logger,
+        )
+
+    def _build_image(self, instance_id: str | None = None) -> None:
         instance = self.record.instance
+        future = self._build_futures.pop(instance_id, None) if instance_id else None
+        if future is not None:
+            self.logger.info(f"Waiting for prefetched image build for {instance.name()}")
+            future.result()
+            return
         self.logger.info(f"Building image for {instance.name()}")
+        cached_tag = self._get_cached_task_image_name() if self.args.cache_task_images else None
         build_image(
             instance.dependency(),
             cli=self.args.cli_args,
-            logger=self.logger
+            logger=self.logger,
+            cache_from=cached_tag,
+            cache_tag=cached_tag,
         )
         
 
@@ -550,18 +683,17 @@ class SWEEnv(gym.Env):
         self.close()
         self.container = None
         self.container_obj = None
+        self._conda_envs = None
         self._reset_container(instance_id)
 
     @staticmethod
     def _get_container_name(image_name: str) -> str:
         """Return name of container"""
-        process_id = str(os.getpid())
-        current_time = str(datetime.datetime.now())
-        unique_string = current_time + process_id
-        hash_object = hashlib.sha256(unique_string.encode())
+        # The suffix only needs to be unique; random bytes achieve that
+        # without hashing pid and timestamp at all.
         image_name_sanitized = image_name.replace("/", "-")
         image_name_sanitized = image_name_sanitized.replace(":", "-")
-        return f"{image_name_sanitized}-{hash_object.hexdigest()[:10]}"
+        return f"{image_name_sanitized}-{os.urandom(5).hex()}"
 
     def _init_container(self, cached_image: str | None = None) -> None:
         """
@@ -578,49 +710,75 @@ class SWEEnv(gym.Env):
             # Make sure that we get a new container name just in case removing didn't work.
             # Might be a fix for https://github.com/princeton-nlp/SWE-agent/issues/451
             self.container_name = self._get_container_name(image_name)
-        self.container, self.parent_pids = get_container(self.container_name, image_name, persistent=self.persistent)
-        try:
-            client = docker.from_env(timeout=600)
-        except docker.errors.DockerException as e:
-            if "Error while fetching server API version" in str(e):
-                msg = "Docker is not running. Please start Docker and try again."
-            else:
-                msg = "Unknown docker exception occurred. Are you sure docker is running?"
-            raise RuntimeError(msg) from e
-        t0 = time.time()
+        self.container, parent_pids = get_container(self.container_name, image_name, persistent=self.persistent)
+        # Frozen for O(1) membership tests in get_pids.
+        self.parent_pids = frozenset(parent_pids)
+        client = self._get_docker_client()
+        # Wait for the container via the daemon's event stream instead of
+        # polling with a sleep. Subscribe before the first lookup so a start
+        # between the two calls is not missed; `until` bounds the wait.
         self.container_obj = None
-        while time.time() - t0 < 60:
+        events = client.events(
+            decode=True,
+            filters={"container": self.container_name, "event": "start"},
+            until=int(time.time()) + 60,
+        )
+        try:
             try:
                 self.container_obj = client.containers.get(self.container_name)
             except docker.errors.NotFound:
-                self.logger.debug("Couldn't find container. Let's wait and retry.")
-                time.sleep(1)
-            else:
-                break
-        else:
-            print(f"{self.persistent=}")
-            available_containers = client.containers.list(all=True)
-            available_containers_info = json.dumps([str(c.attrs) for c in available_containers], indent=2)
-            print(available_containers_info)
+                self.logger.debug("Couldn't find container yet. Waiting for its start event.")
+                for _ in events:
+                    try:
+                        self.container_obj = client.containers.get(self.container_name)
+                    except docker.errors.NotFound:
+                        continue
+                    break
+        finally:
+            events.close()
+        if self.container_obj is None:
+            # Serializing every container's attrs can be multi-MB on busy
+            # hosts; only do it when verbose debugging is on, and cap it.
+            if self.args.verbose:
+                self.logger.debug(f"{self.persistent=}")
+                available_containers = client.containers.list(all=True)[:20]
+                available_containers_info = json.dumps([str(c.attrs) for c in available_containers], indent=2)
+                self.logger.debug(available_containers_info)
             msg = "Failed to get container object."
             raise RuntimeError(msg)
         self.logger.info("🌱 Environment Initialized")
 
+    @classmethod
+    def _get_docker_client(cls) -> docker.DockerClient:
+        """Return the shared docker client, creating it on first use."""
+        with cls._docker_client_lock:
+            if cls._docker_client is None:
+                try:
+                    cls._docker_client = docker.from_env(timeout=600)
+                except docker.errors.DockerException as e:
+                    if "Error while fetching server API version" in str(e):
+                        msg = "Docker is not running. Please start Docker and try again."
+                    else:
+                        msg = "Unknown docker exception occurred. Are you sure docker is running?"
+                    raise RuntimeError(msg) from e
+            return cls._docker_client
+
     def _init_scripts(self):
         """
         Initialize custom commands within container
+
+        The PATH export has to run in the session shell (the container's bash
+        is non-interactive and would not read .bashrc), so this cannot move
+        into the image build; one batched round-trip is the floor.
         """
-        self.communicate_with_handling(
-            "mkdir -p /root/commands",
-            error_msg="Failed to create commands directory",
-        )
-        self.communicate_with_handling(
-            "touch /root/commands/__init__.py",
-            error_msg="Failed to create __init__.py",
-        )
-        self.communicate_with_handling(
-            "export PATH=$PATH:/root/commands",
-            error_msg="Failed to add commands directory to PATH",
+        self._communicate_batch(
+            [
+                "mkdir -p /root/commands",
+                "touch /root/commands/__init__.py",
+                "export PATH=$PATH:/root/commands",
+            ],
+            error_msg="Failed to initialize commands directory",
+            check_syntax=False,
         )
 
     def _communicate_experimental(
@@ -628,16 +786,18 @@ class SWEEnv(gym.Env):
         input: str,
         timeout_duration=25,
         no_output_timeout_duration: int | float = 25,
+        max_bytes: int | None = None,
     ) -> str:
         """Experimental version of `_communicate`"""
         assert self.container is not None
-        command_suffix = f"echo {PROCESS_DONE_MARKER_START}$?{PROCESS_DONE_MARKER_END}\n"
         try:
             self.returncode = None
             cmd = input if input.endswith("\n") else input + "\n"
-            cmd += command_suffix
-            os.write(self.container.stdin.fileno(), cmd.encode())
-            time.sleep(0.03)
+            # Vectored write: command and pre-encoded marker suffix go out in
+            # one syscall without concatenating them first. os.writev is
+            # unbuffered; the end-marker protocol tells us when output is
+            # complete, so no settling sleep is needed.
+            os.writev(self.container.stdin.fileno(), [cmd.encode(), COMMAND_SUFFIX_BYTES])
             self.container.stdin.flush()
         except BrokenPipeError:
             traceback.print_exc()
@@ -645,7 +805,9 @@ class SWEEnv(gym.Env):
             msg = "Failed to communicate with container"
             raise RuntimeError(msg)
 
-        buffer, exit_code = read_with_timeout_experimental(self.container, timeout_duration, no_output_timeout_duration)
+        buffer, exit_code = read_with_timeout_experimental(
+            self.container, timeout_duration, no_output_timeout_duration, max_bytes=max_bytes
+        )
         self.returncode = int(exit_code)
         return buffer
 
@@ -654,18 +816,15 @@ class SWEEnv(gym.Env):
         input: str,
         timeout_duration=25,
         no_output_timeout_duration: int | float = 25,
+        max_bytes: int | None = None,
     ) -> str:
         assert self.container is not None
-        communicate_method = keys_config.get(
-            "SWE_AGENT_COMMUNICATE_METHOD", default="end-marker", choices=["end-marker", "processes"]
-        )
-        if communicate_method == "end-marker":
-            return self._communicate_experimental(input, timeout_duration, no_output_timeout_duration)
+        if self._communicate_method == "end-marker":
+            return self._communicate_experimental(input, timeout_duration, no_output_timeout_duration, max_bytes=max_bytes)
         try:
             self.returncode = None
             cmd = input if input.endswith("\n") else input + "\n"
             os.write(self.container.stdin.fileno(), cmd.encode())
-            time.sleep(0.1)
             self.container.stdin.flush()
         except BrokenPipeError:
             traceback.print_exc()
@@ -675,7 +834,6 @@ class SWEEnv(gym.Env):
         try:
             buffer = read_with_timeout(self.container, self.get_pids, timeout_duration)
             self.container.stdin.write("echo $?\n")
-            time.sleep(0.1)
             self.container.stdin.flush()
             exit_code = read_with_timeout(self.container, self.get_pids, 5).strip()
         except Exception as e:
@@ -699,24 +857,32 @@ class SWEEnv(gym.Env):
         input: str,
         timeout_duration=25,
         no_output_timeout_duration: int | float | None = 25,
+        check_syntax: bool = True,
+        max_bytes: int | None = None,
     ) -> str:
         """
         Sends input to container and returns output
 
         Args:
             input: input to send to container
+            check_syntax: validate input with `bash -n` first. Skip for
+                static internal commands to save one round-trip each.
+            max_bytes: cap output buffering to roughly this many bytes,
+                keeping head and tail (end-marker method only).
 
         Returns:
             output: output from container
         """
         if input.strip() != "exit":
-            output, valid = self._check_syntax(input)
-            if not valid:
-                return output  # shows syntax errors
+            if check_syntax:
+                output, valid = self._check_syntax(input)
+                if not valid:
+                    return output  # shows syntax errors
             output = self._communicate(
                 input,
                 timeout_duration=timeout_duration,
-                no_output_timeout_duration=no_output_timeout_duration
+                no_output_timeout_duration=no_output_timeout_duration,
+                max_bytes=max_bytes,
             )
             self.communicate_output = output
             return output
@@ -726,7 +892,7 @@ class SWEEnv(gym.Env):
             self.communicate_output = ""
             return ""
 
-    def communicate_with_handling(self, input: str, error_msg: str, timeout_duration=25, no_output_timeout_duration= 25, except_error_msgs = []) -> str:
+    def communicate_with_handling(self, input: str, error_msg: str, timeout_duration=25, no_output_timeout_duration= 25, except_error_msgs = [], check_syntax: bool = True) -> str:
         """
         Wrapper for communicate function that raises error if return code is non-zero
 
@@ -738,9 +904,9 @@ class SWEEnv(gym.Env):
         Returns:
             output: output from container
         """
-        logs = self.communicate(input, timeout_duration=timeout_duration, no_output_timeout_duration=no_output_timeout_duration)
+        logs = self.communicate(input, timeout_duration=timeout_duration, no_output_timeout_duration=no_output_timeout_duration, check_syntax=check_syntax)
         if self.returncode != 0:
-            if any( caught_err in logs for caught_err in except_error_msgs):
+            if except_error_msgs and _except_error_pattern(tuple(except_error_msgs)).search(logs):
                 self.logger.warning(f'the error message is in exception, some adjustmens will be acted to the commands.')
                 return logs
             self.logger.error(f"{error_msg}: {logs}")
@@ -749,6 +915,21 @@ class SWEEnv(gym.Env):
             raise RuntimeError(msg)
         return logs
 
+    def _communicate_batch(self, cmds: list[str], error_msg: str, **kwargs) -> str:
+        """
+        Send several commands through a single round-trip instead of one
+        communicate call each. Commands are joined with `&&`, so a failure
+        stops the chain and surfaces through the usual non-zero exit handling.
+
+        Args:
+            cmds: commands to run in order
+            error_msg: error message to raise if the chain fails
+
+        Returns:
+            output: output from container
+        """
+        return self.communicate_with_handling(" && ".join(cmds), error_msg=error_msg, **kwargs)
+
     def get_available_actions(self) -> list[str]:
         """
         Returns list of available actions in current environment state
@@ -768,11 +949,26 @@ class SWEEnv(gym.Env):
         Returns:
             list of PIDs
         """
-        pids = self.container_obj.exec_run("ps -eo pid,comm --no-headers").output.decode().split("\n")
-        pids = [x.split() for x in pids if x]
+        # Read /proc directly instead of forking ps, which would walk /proc
+        # itself only to format text we immediately re-parse.
+        # Builtins only: `read` with a redirect costs no fork, and a pid
+        # whose comm vanished mid-loop is skipped instead of printing a
+        # one-field row.
+        raw = self.container_obj.exec_run(
+            [
+                "sh",
+                "-c",
+                'cd /proc && for p in [0-9]*; do { read -r comm < "$p/comm"; } 2>/dev/null'
+                " && printf '%s %s\\n' \"$p\" \"$comm\"; done",
+            ]
+        ).output
+        # Filter on the raw bytes and decode only the survivors; a full
+        # decode-then-split pays two passes over output we mostly discard.
+        pids = [x.split() for x in raw.splitlines() if x]
         if not all_pids:
-            pids = [x for x in pids if x[1] not in ["ps", 'npm', 'yarn', 'sh'] and x[0] not in self.parent_pids]
-        return pids
+            parent_pids = {p.encode() for p in self.parent_pids}
+            pids = [x for x in pids if len(x) > 1 and x[1] not in _SKIP_COMMS and x[0] not in parent_pids]
+        return [[t.decode() for t in x] for x in pids]
 
     def get_submission(self, output: str) -> str:
         """
@@ -784,8 +980,7 @@ class SWEEnv(gym.Env):
         Returns:
             submission: diff patch submission
         """
-        pattern = r"\<\<SUBMISSION\|\|(.*)\|\|SUBMISSION\>\>"
-        match = re.search(pattern, output, re.DOTALL)
+        match = _SUBMISSION_RE.search(output)
         if match is None:
             return None
         return match.group(1)
@@ -809,13 +1004,17 @@ class SWEEnv(gym.Env):
         if not script_path.is_file():
             msg = f"Script not found at {script_path}"
             raise FileNotFoundError(msg)
-        shell_commands = Path(script_path).read_text().splitlines(keepends=True)
-        for i, cmd in enumerate(shell_commands):
-            self.communicate_with_handling(
-                cmd,
-                error_msg=f"Failed to execute line {i}.",
-                timeout_duration=LONG_TIMEOUT,
-            )
+        # Send the whole script in one round-trip; the ERR trap reports the
+        # failing line so error attribution survives the batching. The
+        # subshell keeps set -e and the trap from leaking into (or killing)
+        # the persistent session shell — a failure exits the subshell only,
+        # so the done marker still echoes and surfaces the non-zero status.
+        script = Path(script_path).read_text()
+        self.communicate_with_handling(
+            f"(\nset -e; trap 'echo SCRIPT_FAILED_AT_LINE=$LINENO' ERR\n{script}\n)",
+            error_msg=f"Failed to execute script {script_path}.",
+            timeout_duration=LONG_TIMEOUT,
+        )
 
     def _get_install_configs(self) -> dict | None:
         """Return config for environment setup"""
@@ -831,13 +1030,14 @@ class SWEEnv(gym.Env):
             return None
         if self.args.environment_setup is not None:
             assert isinstance(self.args.environment_setup, (str, os.PathLike))
-            if Path(self.args.environment_setup).suffix in [".yml", ".yaml"]:
+            path = Path(self.args.environment_setup)
+            if path.suffix in [".yml", ".yaml"]:
                 try:
-                    return yaml.safe_load(Path(self.args.environment_setup).read_text())
+                    return _load_environment_yaml(str(path), path.stat().st_mtime)
                 except Exception as e:
                     msg = "Environment config file needs to be a yaml file"
                     raise ValueError(msg) from e
-            elif Path(self.args.environment_setup).suffix == ".sh":
+            elif path.suffix == ".sh":
                 return {
                     "shell_script_path": self.args.environment_setup,
                 }
@@ -848,36 +1048,49 @@ class SWEEnv(gym.Env):
             return None
 
     def _conda_environment_exists(self, env_name: str) -> bool:
-        env_check = self.communicate(f"conda env list | grep {env_name}", timeout_duration=LONG_TIMEOUT)
-        return env_check.strip() != ""
+        # `conda env list` pays conda's full Python startup each call, so the
+        # result is fetched once per container and checked as a set. Creating
+        # an environment must clear `self._conda_envs` to invalidate this.
+        if self._conda_envs is None:
+            env_list = self.communicate("conda env list", timeout_duration=LONG_TIMEOUT, check_syntax=False)
+            self._conda_envs = {
+                line.split()[0] for line in env_list.splitlines() if line.strip() and not line.startswith("#")
+            }
+        return env_name in self._conda_envs
 
     def add_commands(self, commands: list[dict]) -> None:
         """
         Adds custom commands to container
         """
-        for command in commands:
-            name = command["name"]
-            contents = command["contents"]
-            copy_file_to_container(self.container_obj, contents, f"/root/commands/{name}")
-            if command["type"] == "source_file":
-                self.communicate_with_handling(
-                    f"source /root/commands/{name}",
-                    error_msg=(
-                        f"Failed to source {name}. If you meant to make a script,"
-                        " start the file with a shebang (e.g. #!/usr/bin/env python)."
-                    ),
-                )
-            elif command["type"] == "script":
-                self.communicate_with_handling(
-                    f"chmod +x /root/commands/{name}",
-                    error_msg=f"Failed to chmod {name}",
-                )
-            elif command["type"] == "utility":
-                # nothing to do for utility scripts
-                pass
-            else:
-                msg = f"Invalid command type: {command['type']}"
-                raise ValueError(msg)
+        if not commands:
+            return
+        assert self.container_obj is not None
+        # One tar upload for all command files instead of a docker API
+        # round-trip per file; the executable bit is set in the tar header
+        # so no chmod calls are needed afterwards.
+        buf = io.BytesIO()
+        source_names = []
+        with tarfile.open(fileobj=buf, mode="w") as tf:
+            for command in commands:
+                if command["type"] not in ("source_file", "script", "utility"):
+                    msg = f"Invalid command type: {command['type']}"
+                    raise ValueError(msg)
+                data = command["contents"].encode()
+                info = tarfile.TarInfo(command["name"])
+                info.size = len(data)
+                info.mode = 0o755
+                tf.addfile(info, io.BytesIO(data))
+                if command["type"] == "source_file":
+                    source_names.append(command["name"])
+        self.container_obj.put_archive("/root/commands", buf.getvalue())
+        if source_names:
+            self._communicate_batch(
+                [f"source /root/commands/{name}" for name in source_names],
+                error_msg=(
+                    f"Failed to source {source_names}. If you meant to make a script,"
+                    " start the file with a shebang (e.g. #!/usr/bin/env python)."
+                ),
+            )
 
     def interrupt(self):
         """
@@ -886,20 +1099,20 @@ class SWEEnv(gym.Env):
         assert self.container is not None
         assert self.container_obj is not None
         pids = self.get_pids()
-        for p in reversed(pids):
-            # We need to avoid to kill the main process which is in the small pid
-            pid = p[0]
-            self.container_obj.exec_run(f"kill -9 {pid}")
+        # kill accepts multiple PIDs, so one exec round-trip covers them all.
+        # get_pids already excluded the main process and its parents.
+        pid_list = " ".join(p[0] for p in reversed(pids))
+        if pid_list:
+            self.container_obj.exec_run(f"kill -9 {pid_list}")
         observation = ""
         try:
             observation += read_with_timeout(self.container, self.get_pids, 20)
         except TimeoutError:
             pass
         try:
-            # This is a workaround because of bash behaviour
-            # when sometimes we get the prints of Killed after we press some "Enter" in stdin
-            self.communicate(input="echo 'interrupted'", timeout_duration=5)
-            output = self.communicate(input="echo 'interrupted'", timeout_duration=5)
+            # The leading newline flushes any stray "Killed" prints bash
+            # emits after the signals, so one sentinel round-trip suffices.
+            output = self.communicate(input="\necho 'interrupted'", timeout_duration=5)
             assert output.strip().endswith("interrupted"), "container health check failed"
         except TimeoutError:
             msg = "Failed to interrupt container"
@@ -911,7 +1124,7 @@ class SWEEnv(gym.Env):
         if self.remove_image:
             image_name: str = self.record.instance.dependency().image_full_name()
             self.logger.info(f"Removing image of {image_name}")
-            remove_image(image_name)
+            _image_removal_executor.submit(remove_image, image_name)
 
 
     def open_pr(self, *, trajectory, _dry_run: bool = False):
@@ -926,35 +1139,30 @@ class SWEEnv(gym.Env):
         # Adding random string suffix to avoid name conflicts if we had a previously failed run
         issue_url = self.args.data_path
         try:
-            issue = get_gh_issue_data(issue_url, token=self._github_token)
+            issue = _cached_gh_issue_data(issue_url, token=self._github_token)
         except InvalidGithubURL as e:
             msg = "Data path must be a github issue URL if --open_pr is set."
             raise ValueError(msg) from e
-        branch_name = f"swe-agent-fix-#{issue.number}-" + str(random.random())[2:10]
+        branch_name = f"swe-agent-fix-#{issue.number}-{secrets.token_hex(4)}"
 
-        self.communicate_with_handling(
-            input="rm -f model.patch",
-            error_msg="Failed to remove model patch",
-            timeout_duration=10,
-        )
-        self.communicate_with_handling(
-            input=f"git checkout -b {branch_name}",
-            error_msg="Failed to switch to new branch",
-            timeout_duration=10,
-        )
-        self.communicate_with_handling(
-            input="git add .",
-            error_msg="Failed to add commits",
-            timeout_duration=10,
-        )
+        # One round-trip for the whole local git sequence; each stage tags
+        # its failure so the error message still points at the right step.
         dry_run_flag = "--allow-empty" if _dry_run else ""
+        commit_title = shlex.quote(f"Fix: {issue.title}")
         self.communicate_with_handling(
-            input=f"git commit -m 'Fix: {issue.title}' -m 'Closes #{issue.number}' {dry_run_flag}",
-            error_msg="Failed to commit changes",
-            timeout_duration=10,
+            input=" && ".join(
+                (
+                    "rm -f model.patch || { echo STAGE=rm; false; }",
+                    f"git checkout -b {branch_name} || {{ echo STAGE=checkout; false; }}",
+                    "git add . || { echo STAGE=add; false; }",
+                    f"git commit -m {commit_title} -m 'Closes #{issue.number}' {dry_run_flag} || {{ echo STAGE=commit; false; }}",
+                )
+            ),
+            error_msg="Failed to prepare branch and commit changes",
+            timeout_duration=30,
         )
 
-        owner, repo, _ = parse_gh_issue_url(issue_url)
+        owner, repo, _ = _cached_parse_gh_issue_url(issue_url)
         # If `--repo_path` was specified with a different github URL, then the record will contain
         # the forking user
         assert self.record is not None
@@ -988,11 +1196,18 @@ class SWEEnv(gym.Env):
             ),
             timeout_duration=10,
         )
-        body = (
-            f"This is a PR opened by AI tool [SWE Agent](https://github.com/princeton-nlp/SWE-agent/) "
-            f"to close [#{issue.number}]({issue_url}) ({issue.title}).\n\nCloses #{issue.number}."
+        # Joined in one pass; += would materialize the header twice for
+        # long trajectories.
+        body = "".join(
+            (
+                f"This is a PR opened by AI tool [SWE Agent](https://github.com/princeton-nlp/SWE-agent/) "
+                f"to close [#{issue.number}]({issue_url}) ({issue.title}).\n\nCloses #{issue.number}.",
+                "\n\n",
+                format_trajectory_markdown(trajectory),
+            )
         )
-        body += "\n\n" + format_trajectory_markdown(trajectory)
+        from ghapi.all import GhApi
+
         api = GhApi(token=self._github_token)
         if not _dry_run:
             pr_info = api.pulls.create(
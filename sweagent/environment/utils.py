@@ -8,16 +8,17 @@ import re
 import shlex
 import subprocess
 import tarfile
-import tempfile
 import time
 import traceback
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from io import BytesIO
 from pathlib import Path
 from subprocess import PIPE, STDOUT
-from typing import Any, Callable
+from typing import TYPE_CHECKING, Any, Callable
 
 from datasets import load_dataset, load_from_disk
-from ghapi.all import GhApi
 from git import InvalidGitRepositoryError, Repo
 
 import docker
@@ -27,11 +28,16 @@ from sweagent.utils.log import get_logger
 from multi_swe_bench.harness.build_dataset import prepare_datas, data_registry
 from multi_swe_bench.harness.instance import Record
 
+if TYPE_CHECKING:
+    from ghapi.all import GhApi
+
 class NoOutputTimeoutError(TimeoutError): ...
 
 DOCKER_START_UP_DELAY = float(keys_config.get("SWE_AGENT_DOCKER_START_UP_DELAY", 1))
 GITHUB_ISSUE_URL_PATTERN = re.compile(r"github\.com\/(.*?)\/(.*?)\/issues\/(\d+)")
-GITHUB_REPO_URL_PATTERN = re.compile(r".*[/@]?github\.com\/([^/]+)\/([^/]+)")
+# Anchored on the host instead of a leading greedy `.*`, which backtracked
+# on long non-URL inputs; the repo group also stops at query/fragment chars.
+GITHUB_REPO_URL_PATTERN = re.compile(r"(?:^|[/@.])github\.com/([^/]+)/([^/\s#?]+)")
 
 LANGUAGE_MAP = {
     "java": ["java"],
@@ -46,13 +52,27 @@ LANGUAGE_MAP = {
 logger = get_logger("env_utils")
 
 
+@lru_cache(maxsize=4096)
+def _sha6(text: str) -> str:
+    """Short content digest used for instance ids; memoized because the
+    same problem statement is hashed by several call paths."""
+    return hashlib.sha256(text.encode()).hexdigest()[:6]
+
+
+@lru_cache(maxsize=1)
+def _docker_client() -> docker.DockerClient:
+    """One daemon connection per process; docker.from_env reparses the
+    environment and opens a fresh HTTP connection on every call."""
+    return docker.from_env()
+
+
 
 def get_data_path_name(data_path: str) -> str:
     """if data_path is a file, return the file stem
     elif it's a github url, return the owner__repo_name
     """
     if data_path.startswith("text://"):
-        return hashlib.sha256(data_path.removeprefix("text://").encode()).hexdigest()[:6]
+        return _sha6(data_path.removeprefix("text://"))
     match = GITHUB_ISSUE_URL_PATTERN.search(data_path)
     if match:
         owner, repo, _ = match.groups()
@@ -85,37 +105,21 @@ def copy_file_to_container(container: Container, contents: str, container_path:
     Returns:
         None
     """
-    temp_file_name = None
-
     try:
-        # Create a temporary file
-        with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-            temp_file_name = temp_file.name
-            # Write the string to the temporary file and ensure it's written to disk
-            temp_file.write(contents.encode("utf-8"))
-            temp_file.flush()
-            os.fsync(temp_file.fileno())
-
-        # Create a TAR archive in memory containing the temporary file
-        with tempfile.NamedTemporaryFile():
-            with open(temp_file_name, "rb") as temp_file:
-                # Prepare the TAR archive
-                with BytesIO() as tar_stream:
-                    with tarfile.open(fileobj=tar_stream, mode="w") as tar:
-                        tar_info = tarfile.TarInfo(name=os.path.basename(container_path))
-                        tar_info.size = os.path.getsize(temp_file_name)
-                        tar.addfile(tarinfo=tar_info, fileobj=temp_file)
-                    tar_stream.seek(0)
-                    # Copy the TAR stream to the container
-                    container.put_archive(path=os.path.dirname(container_path), data=tar_stream.read())
-
+        # Build the TAR archive entirely in memory; going through a fsynced
+        # temp file made this memory-to-container copy pay disk latency.
+        data = contents.encode("utf-8")
+        with BytesIO() as tar_stream:
+            with tarfile.open(fileobj=tar_stream, mode="w") as tar:
+                tar_info = tarfile.TarInfo(name=os.path.basename(container_path))
+                tar_info.size = len(data)
+                tar.addfile(tarinfo=tar_info, fileobj=BytesIO(data))
+            tar_stream.seek(0)
+            # Copy the TAR stream to the container
+            container.put_archive(path=os.path.dirname(container_path), data=tar_stream.read())
     except Exception as e:
         logger.error(f"An error occurred: {e}")
         logger.error(traceback.format_exc())
-    finally:
-        # Cleanup: Remove the temporary file if it was created
-        if temp_file_name and os.path.exists(temp_file_name):
-            os.remove(temp_file_name)
 
 
 def copy_anything_to_container(container: Container, host_path: str, container_path: str) -> None:
@@ -126,6 +130,18 @@ def copy_anything_to_container(container: Container, host_path: str, container_p
     if not Path(host_path).exists():
         msg = f"Path {host_path} does not exist, cannot copy it to container."
         raise FileNotFoundError(msg)
+    try:
+        # Stream a tar through the SDK; forking the docker CLI pays a
+        # process spawn and daemon handshake per copied path. tar.add
+        # recurses into directories on its own.
+        with BytesIO() as buf:
+            with tarfile.open(fileobj=buf, mode="w") as tar:
+                tar.add(host_path, arcname=os.path.basename(container_path))
+            buf.seek(0)
+            container.put_archive(os.path.dirname(container_path), buf.read())
+        return
+    except Exception as e:
+        logger.warning(f"put_archive failed for {host_path} ({e}), falling back to docker cp.")
     cmd = ["docker", "cp", host_path, f"{container.id}:{container_path}"]
     logger.debug(f"Copying {host_path} to container at {container_path} with command: {shlex.join(cmd)}")
     try:
@@ -151,7 +167,9 @@ def read_with_timeout(container: subprocess.Popen, pid_func: Callable, timeout_d
     Raises:
         TimeoutError: If the timeout duration is reached while reading from the subprocess.
     """
-    buffer = b""
+    # bytearray so appends are amortized O(1) instead of copying the whole
+    # accumulated buffer on every read.
+    buffer = bytearray()
     fd = container.stdout.fileno()
     end_time = time.time() + timeout_duration
 
@@ -159,8 +177,7 @@ def read_with_timeout(container: subprocess.Popen, pid_func: Callable, timeout_d
     is_windows = platform.system() == "Windows"
     if not is_windows:
         import select
-    else:
-        os.set_blocking(fd, False)
+    os.set_blocking(fd, False)
 
     def ready_to_read(fd) -> bool:
         if is_windows:
@@ -174,14 +191,17 @@ def read_with_timeout(container: subprocess.Popen, pid_func: Callable, timeout_d
             # There are still PIDs running
             time.sleep(0.05)
             continue
-        if ready_to_read(fd):
-            data = os.read(fd, 8192)
-            if data:
-                buffer += data
-        else:
-            # No more data to read
-            break
-        time.sleep(0.05)  # Prevents CPU hogging
+        # The command is done; drain whatever the pipe still holds in one
+        # go instead of sleeping between reads.
+        while ready_to_read(fd):
+            try:
+                data = os.read(fd, 8192)
+            except BlockingIOError:
+                break
+            if not data:
+                break
+            buffer.extend(data)
+        break
 
     if container.poll() is not None:
         msg = f"Subprocess exited unexpectedly.\nCurrent buffer: {buffer.decode()}"
@@ -194,24 +214,24 @@ def read_with_timeout(container: subprocess.Popen, pid_func: Callable, timeout_d
 
 PROCESS_DONE_MARKER_START = "///PROCESS-DONE:"
 PROCESS_DONE_MARKER_END = ":PROCESS-DONE///"
+PROCESS_DONE_MARKER_START_BYTES = PROCESS_DONE_MARKER_START.encode()
 PROCESS_DONE_REGEX = re.compile(rf"{PROCESS_DONE_MARKER_START}(.+?){PROCESS_DONE_MARKER_END}")
 DECODED_BUFFER_FAILURE_THRESHOLD = 0.1
 
 def _check_for_too_many_non_unicode_bytes(buffer: bytes):
-    number_of_failures = int(DECODED_BUFFER_FAILURE_THRESHOLD * len(buffer))
-    start_byte = 0
-    for _ in range(number_of_failures):
-        try:
-            buffer[start_byte:].decode()
-            return
-        except UnicodeDecodeError as e:
-            start_byte = e.start + 1
-    msg = "Too many non-unicode characters in output of command."
-    raise UnicodeError(msg)
+    # One replace-mode decode counts every undecodable byte; retrying
+    # strict decodes re-scanned the whole remaining tail per bad byte.
+    number_of_failures = buffer.decode("utf-8", errors="replace").count("�")
+    if number_of_failures > int(DECODED_BUFFER_FAILURE_THRESHOLD * len(buffer)):
+        msg = "Too many non-unicode characters in output of command."
+        raise UnicodeError(msg)
 
 
 def read_with_timeout_experimental(
-    container: subprocess.Popen, timeout_duration: int | float, no_output_timeout_duration: int | float
+    container: subprocess.Popen,
+    timeout_duration: int | float,
+    no_output_timeout_duration: int | float,
+    max_bytes: int | None = None,
 ) -> tuple[str, str]:
     """
     Read data from a subprocess with a timeout.
@@ -224,6 +244,8 @@ def read_with_timeout_experimental(
         container: The subprocess container.
         timeout_duration: The timeout duration in seconds.
         no_output_timeout_duration: The timeout duration to wait if no output is produced, in seconds.
+        max_bytes: If set, keep only the first and last max_bytes/2 of output,
+            discarding the middle as it arrives instead of buffering it all.
 
     Returns:
         Output and exit code, both as strings (!)
@@ -231,7 +253,20 @@ def read_with_timeout_experimental(
     Raises:
         TimeoutError: If the timeout duration is reached while reading from the subprocess.
     """
-    buffer = b""
+    head = bytearray()
+    tail: deque[bytes] = deque()
+    tail_len = 0
+    truncated = False
+    half = max_bytes // 2 if max_bytes is not None else None
+    # Sliding window for marker detection; overlaps reads so a marker split
+    # across two chunks is still found.
+    marker_bytes = PROCESS_DONE_MARKER_START_BYTES
+    overlap = len(marker_bytes) + 16
+    window = b""
+    # Reads land in one reusable buffer via readv, so the hot loop does not
+    # allocate a fresh bytes object per 64 KiB chunk.
+    scratch = bytearray(65536)
+    scratch_view = memoryview(scratch)
     fd = container.stdout.fileno()
     start_time = time.time()
     end_time = start_time + timeout_duration
@@ -241,34 +276,77 @@ def read_with_timeout_experimental(
     is_windows = platform.system() == "Windows"
     if not is_windows:
         import select
-    else:
-        os.set_blocking(fd, False)
+    os.set_blocking(fd, False)
 
-    def ready_to_read(fd) -> bool:
+    def wait_readable() -> bool:
+        """Block until the fd is readable or the deadline passes; the kernel
+        wakes us on readiness instead of us polling at 100 Hz."""
         if is_windows:
             # We can't do the extra check
             return True
-        return bool(select.select([fd], [], [], 0.01)[0])
+        remaining = min(end_time, end_time_no_output) - time.time()
+        if remaining <= 0:
+            return False
+        return bool(select.select([fd], [], [], remaining)[0])
 
     process_done = False
+    eof = False
 
-    while time.time() < min(end_time, end_time_no_output):
-        if ready_to_read(fd):
+    while not process_done and not eof and time.time() < min(end_time, end_time_no_output):
+        if not wait_readable():
+            break
+        # Drain everything currently in the pipe before waiting again.
+        while True:
             try:
-                data = os.read(fd, 65536)
+                n = os.readv(fd, [scratch_view])
             except BlockingIOError:
-                logger.error("BlockingIOError while reading from subprocess.", exc_info=True)
+                if is_windows:
+                    time.sleep(0.01)  # Prevents CPU hogging
+                break
+            if n == 0:
+                eof = True
+                break
+            end_time_no_output = time.time() + no_output_timeout_duration
+            if half is None or len(head) < half:
+                head += scratch_view[:n]
+            else:
+                tail.append(bytes(scratch_view[:n]))
+                tail_len += n
+                while tail and tail_len - len(tail[0]) > half:
+                    tail_len -= len(tail.popleft())
+                    truncated = True
+            # Check within the chunk, and across the previous boundary via
+            # the carried window.
+            if (
+                scratch.find(marker_bytes, 0, n) != -1
+                or marker_bytes in window + bytes(scratch_view[: min(n, overlap)])
+            ):
+                process_done = True
                 break
-            if data:
-                end_time_no_output = time.time() + no_output_timeout_duration
-                buffer += data
-                if PROCESS_DONE_MARKER_START in buffer.decode("utf-8", errors="backslashreplace").replace("\r\n", "\n"):
-                    process_done = True
-                    break
-        time.sleep(0.01)  # Prevents CPU hogging
+            window = bytes(scratch_view[max(0, n - overlap) : n])
 
+    if truncated:
+        buffer = bytes(head) + b"\n...[output truncated]...\n" + b"".join(tail)
+    else:
+        buffer = bytes(head) + b"".join(tail)
     decoded = buffer.decode("utf-8", errors="backslashreplace").replace("\r\n", "\n")
-    body = "\n".join(line for line in decoded.splitlines() if not line.startswith(PROCESS_DONE_MARKER_START))
+    # Cut marker lines out with find/slice; splitting megabytes of output
+    # into a list of lines just to drop one of them is O(lines) allocations.
+    parts = []
+    start = 0
+    idx = decoded.find(PROCESS_DONE_MARKER_START)
+    while idx != -1:
+        if idx == 0 or decoded[idx - 1] == "\n":
+            newline = decoded.find("\n", idx)
+            parts.append(decoded[start:idx])
+            start = newline + 1 if newline != -1 else len(decoded)
+            idx = decoded.find(PROCESS_DONE_MARKER_START, start)
+        else:
+            idx = decoded.find(PROCESS_DONE_MARKER_START, idx + 1)
+    parts.append(decoded[start:])
+    body = "".join(parts)
+    if body.endswith("\n"):
+        body = body[:-1]
 
     if container.poll() is not None:
         msg = f"Subprocess exited unexpectedly.\nCurrent buffer: {decoded}"
@@ -284,10 +362,12 @@ def read_with_timeout_experimental(
             raise NoOutputTimeoutError(msg, body)
 
     _check_for_too_many_non_unicode_bytes(buffer=buffer)
-    for line in reversed(decoded.splitlines()):
-        _results = PROCESS_DONE_REGEX.search(line)
-        if _results is not None:
-            break
+    # The marker is the last thing the shell prints, so one search over the
+    # final stretch of the output replaces the reversed line-by-line scan;
+    # fall back to a full search just in case.
+    _results = PROCESS_DONE_REGEX.search(decoded, max(0, len(decoded) - 128))
+    if _results is None:
+        _results = PROCESS_DONE_REGEX.search(decoded)
     if _results is None:
         msg = f"Could not find process done marker in last line: {decoded=}, {body=}"
         raise ValueError(msg)
@@ -296,6 +376,9 @@ def read_with_timeout_experimental(
 
 
 def get_background_pids(container_obj: Container):
+    # Must run inside the container: the daemon's top endpoint reports
+    # host-namespace pids, which neither the init-bash filter below nor
+    # the callers comparing against in-container pids can use.
     pids = container_obj.exec_run("ps -eo pid,comm --no-headers").output.decode().split("\n")
     pids = [x.split() for x in pids if x]
     pids = [x for x in pids if x[1] not in {"ps"} and x[0] != "1"]
@@ -338,7 +421,7 @@ def _get_non_persistent_container(ctr_name: str, image_name: str) -> tuple[subpr
 def _get_persistent_container(
     ctr_name: str, image_name: str, persistent: bool = False
 ) -> tuple[subprocess.Popen, set[str]]:
-    client = docker.from_env()
+    client = _docker_client()
     containers = client.containers.list(all=True, filters={"name": ctr_name})
     if ctr_name in [c.name for c in containers]:
         container_obj = client.containers.get(ctr_name)
@@ -389,15 +472,18 @@ def _get_persistent_container(
     # Get the process IDs of the container
     # There should be at least a head process and possibly one child bash process
     bash_pids, other_pids = get_background_pids(container_obj)
-    total_time_slept = DOCKER_START_UP_DELAY
-    # Let's wait for a maximum of 5 x DOCKER_START_UP_DELAY seconds
-    # and then check again.
+    # Exponential backoff up to a total of 5 x DOCKER_START_UP_DELAY
+    # seconds; quickly-ready containers get re-checked within fractions
+    # of a second instead of a fixed 1 s cadence.
+    total_time_slept = 0.0
+    sleep_duration = 0.2
     while len(bash_pids) > 1 or len(other_pids) > 0:
-        time.sleep(1)
-        total_time_slept += 1
-        bash_pids, other_pids = get_background_pids(container_obj)
         if total_time_slept > 5 * DOCKER_START_UP_DELAY:
             break
+        time.sleep(sleep_duration)
+        total_time_slept += sleep_duration
+        sleep_duration = min(sleep_duration * 2, 2)
+        bash_pids, other_pids = get_background_pids(container_obj)
     bash_pid = 1
     if len(bash_pids) == 1:
         bash_pid = bash_pids[0][0]
@@ -445,7 +531,7 @@ def image_exists(image_name: str) -> bool:
         bool: True if image exists
     """
     try:
-        client = docker.from_env()
+        client = _docker_client()
     except docker.errors.DockerException as e:
         docker_not_running = any(
             (
@@ -479,7 +565,7 @@ def image_exists(image_name: str) -> bool:
 
 def remove_image(image_name: str) -> None:
     """Remove an image from the local docker registry"""
-    client = docker.from_env()
+    client = _docker_client()
     filterred_images = client.images.list(filters={"reference": image_name})
     if len(filterred_images) == 0:
         logger.warning(f"Image {image_name} not found, skipping removal.")
@@ -554,12 +640,18 @@ def get_gh_issue_data(issue_url: str, *, token: str = ""):
     for return format
     """
     owner, repo, issue_number = parse_gh_issue_url(issue_url)
+    # ghapi is only needed on the GitHub paths; importing it here keeps it
+    # off the cold-start path for local-repo runs.
+    from ghapi.all import GhApi
+
     api = GhApi(token=token)
     return api.issues.get(owner, repo, issue_number)
 
 
 def get_problem_statement_from_github_issue(owner: str, repo: str, issue_number: str, *, token: str | None = "") -> str:
     """Return problem statement from github issue"""
+    from ghapi.all import GhApi
+
     api = GhApi(token=token)
     issue = api.issues.get(owner, repo, issue_number)
     title = issue.title if issue.title else ""
@@ -581,7 +673,9 @@ class InstanceBuilder:
         self._instance_id_problem_suffix = ""
 
     def set_problem_statement_from_gh_issue(self, issue_url: str):
-        owner, repo, issue_number = parse_gh_issue_url(issue_url)
+        self._set_problem_statement_from_gh_issue_parts(*parse_gh_issue_url(issue_url))
+
+    def _set_problem_statement_from_gh_issue_parts(self, owner: str, repo: str, issue_number: str):
         self.args["problem_statement"] = get_problem_statement_from_github_issue(
             owner,
             repo,
@@ -596,7 +690,7 @@ class InstanceBuilder:
 
     def set_problem_statement_from_text(self, text: str):
         self.args["problem_statement"] = text
-        self.args["instance_id"] = hashlib.sha256(self.args["problem_statement"].encode()).hexdigest()[:6]
+        self.args["instance_id"] = _sha6(self.args["problem_statement"])
         self.args["problem_statement_source"] = "local"
 
     def set_problem_statement(self, data_path: str):
@@ -605,18 +699,25 @@ class InstanceBuilder:
         """
         if data_path.startswith("text://"):
             return self.set_problem_statement_from_text(data_path.removeprefix("text://"))
-        if is_github_issue_url(data_path):
-            return self.set_problem_statement_from_gh_issue(data_path)
-        if Path(data_path).is_file():
+        # Match once and reuse the groups instead of running the same regex
+        # again inside set_problem_statement_from_gh_issue.
+        match = GITHUB_ISSUE_URL_PATTERN.search(data_path)
+        if match:
+            return self._set_problem_statement_from_gh_issue_parts(*match.groups())
+        if os.path.isfile(data_path):
             return self.set_problem_statement_from_file(data_path)
         msg = f"Not sure how to get problem statement from {data_path=}."
         raise ValueError(msg)
 
     def set_repo_info_from_gh_url(self, url: str, base_commit: str | None = None):
-        owner, repo = parse_gh_repo_url(url)
+        self._set_repo_info_from_gh_parts(*parse_gh_repo_url(url), base_commit=base_commit)
+
+    def _set_repo_info_from_gh_parts(self, owner: str, repo: str, base_commit: str | None = None):
         self.args["repo"] = f"{owner}/{repo}"
         self.args["repo_type"] = "github"
         # Always get commit hash, because base_commit can also be branch or tag
+        from ghapi.all import GhApi
+
         api = GhApi(token=self.token)
         self.args["base_commit"] = get_commit(api, owner, repo, ref=base_commit).sha
         if base_commit != self.args["base_commit"]:
@@ -641,9 +742,10 @@ class InstanceBuilder:
         self.args["version"] = self.args["base_commit"][:7]
 
     def set_repo_info(self, repo: str, base_commit: str | None = None):
-        if is_github_repo_url(repo):
-            self.set_repo_info_from_gh_url(repo, base_commit=base_commit)
-        elif Path(repo).is_dir():
+        match = GITHUB_REPO_URL_PATTERN.search(repo)
+        if match:
+            self._set_repo_info_from_gh_parts(*match.groups(), base_commit=base_commit)
+        elif os.path.isdir(repo):
             self.set_repo_info_from_local_path(repo, base_commit=base_commit)
         else:
             msg = f"Could not determine repo path from {repo=}."
@@ -715,33 +817,52 @@ def get_instances(
     }
     
 
+# All language aliases in one alternation; the matched group names the
+# language, so detection is a single scan instead of nested alias loops.
+_LANGUAGE_RE = re.compile(
+    "|".join(
+        f"(?P<{lang}>" + "|".join(re.escape(alias) + r"[_\-]" for alias in aliases) + ")"
+        for lang, aliases in LANGUAGE_MAP.items()
+    )
+)
+
+
+@lru_cache(maxsize=256)
 def specify_languages(file_path: str | Path):
-    for lang in LANGUAGE_MAP:
-        if any(f'{x}_' in str(file_path) for x in LANGUAGE_MAP[lang]) or any(f'{x}-' in str(file_path) for x in LANGUAGE_MAP[lang]):
-            return lang
-    return None
+    match = _LANGUAGE_RE.search(str(file_path))
+    return match.lastgroup if match else None
 
 def get_associated_commit_urls(org: str, repo: str, issue_number: str, *, token: str = "") -> list[str]:
     """Return the URLs of commits that would close an issue."""
+    from ghapi.all import GhApi, paged
+
     api = GhApi(token=token)
+    pattern = re.compile(rf"(?:fixes|closes)\s+#{re.escape(str(issue_number))}\b", re.IGNORECASE)
     # Strangely the "pull_request" field of api.issues.get is often not set
-    # so we have to go through the events to check if there's a commit
-    events = api.issues.list_events(org, repo, issue_number)
+    # so we have to go through the events to check if there's a commit.
+    # Collect the referenced commit ids first, then fetch the commits in
+    # parallel: the per-commit lookups are independent network calls.
+    commit_ids = []
+    for page in paged(api.issues.list_events, org, repo, issue_number, per_page=100):
+        if not page:
+            break
+        commit_ids.extend(event.commit_id for event in page if event.event == "referenced" and event.commit_id)
+    if not commit_ids:
+        return []
     commit_urls = []
-    for event in events:
-        if event.event != "referenced":
-            continue
-        if not event.commit_id:
-            continue
-        commit = api.repos.get_commit(org, repo, event.commit_id)
-        message = commit.commit.message
-        if f"fixes #{issue_number}" in message.lower() or f"closes #{issue_number}" in message.lower():
-            commit_urls.append(commit.html_url)
+    with ThreadPoolExecutor(max_workers=min(8, len(commit_ids))) as pool:
+        for commit in pool.map(lambda commit_id: api.repos.get_commit(org, repo, commit_id), commit_ids):
+            if pattern.search(commit.commit.message):
+                commit_urls.append(commit.html_url)
     return commit_urls
 
 
+# Line-leading triple backticks; one C-level sub replaces a per-line loop.
+_TRIPLE_BACKTICK_PREFIX_RE = re.compile(r"^```", re.MULTILINE)
+
+
 def remove_triple_backticks(text: str) -> str:
-    return "\n".join(line.removeprefix("```") for line in text.splitlines())
+    return _TRIPLE_BACKTICK_PREFIX_RE.sub("", text)
 
 
 _MARKDOWN_TRAJECTORY_EMOJI_MAPPING = {
@@ -754,32 +875,38 @@ _MARKDOWN_TRAJECTORY_EMOJI_MAPPING = {
 
 def format_trajectory_markdown(trajectory: list[dict[str, str]]):
     """Format a trajectory as a markdown string for use in gh PR description."""
-    prefix = [
-        "<details>",
-        "<summary>Thought process ('trajectory') of SWE-agent (click to expand)</summary>",
-        "",
-        "",
+    # One flat list of pieces joined once at the end; the nested join-per-step
+    # allocated an intermediate string for every step of the trajectory.
+    parts = [
+        "<details>\n<summary>Thought process ('trajectory') of SWE-agent (click to expand)</summary>\n\n",
     ]
-    steps = []
     for i, step in enumerate(trajectory):
-        step_strs = []
+        if i:
+            parts.append("\n\n---\n\n")
+        first_in_step = True
         for key, value in step.items():
             emoji = _MARKDOWN_TRAJECTORY_EMOJI_MAPPING.get(key, "")
             if emoji:
                 emoji += " "
-            step_strs.append(f"**{emoji}{key.capitalize()} ({i})**:")
+            if not first_in_step:
+                parts.append("\n")
+            first_in_step = False
+            parts.append(f"**{emoji}{key.capitalize()} ({i})**:")
             if key in ["observation", "state", "action"]:
-                step_strs.append("```")
-                step_strs.append(remove_triple_backticks(value).strip())
-                step_strs.append("```")
+                parts.append("\n```\n")
+                parts.append(remove_triple_backticks(value).strip())
+                parts.append("\n```")
             else:
-                step_strs.append(value.strip())
-        steps.append("\n".join(step_strs))
-    suffix = [
-        "",
-        "</details>",
-    ]
-    return "\n".join(prefix) + "\n\n---\n\n".join(steps) + "\n".join(suffix)
+                parts.append("\n")
+                parts.append(value.strip())
+    parts.append("\n</details>")
+    return "".join(parts)
+
+
+# Problem commands matched with one compiled alternation per family
+# instead of a Python-level substring loop.
+_HACKING_ENDSTOKENS_RE = re.compile(r"\./gradlew")
+_HACKING_NPMS_RE = re.compile(r"npm run|yarn run")
 
 
 def action_hacking(action: str) -> str:
@@ -787,22 +914,11 @@ def action_hacking(action: str) -> str:
     TODO: this is a hack, need some way to fix this in the long term.
     due to some shell command may cause some problems.
     '''
-    hacking_endstokens_commands = [
-        './gradlew'
-    ]
-    for cmd in hacking_endstokens_commands:
-        if cmd in action:
-            action = action.rstrip() + f'; echo {PROCESS_DONE_MARKER_START}$?{PROCESS_DONE_MARKER_END}\n'
-            break
+    if _HACKING_ENDSTOKENS_RE.search(action):
+        action = action.rstrip() + f'; echo {PROCESS_DONE_MARKER_START}$?{PROCESS_DONE_MARKER_END}\n'
 
-    hacking_npms_commands = [
-        'npm run',
-        'yarn run'
-    ]
-    for cmd in hacking_npms_commands:
-        # npm / yarn running is attached to the main process and get hanging, 
-        # with which running raw commands will get timeout or container killed.
-        if cmd in action:
-            action = f"(nohup  {action} & > /dev/null) && sleep 30 && cat /dev/null \n"
-            break
+    # npm / yarn running is attached to the main process and get hanging,
+    # with which running raw commands will get timeout or container killed.
+    if _HACKING_NPMS_RE.search(action):
+        action = f"(nohup  {action} & > /dev/null) && sleep 30 && cat /dev/null \n"
     return action
\ No newline at end of file